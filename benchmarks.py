@@ -0,0 +1,178 @@
+"""
+Benchmark suite for the 2D and 1D solvers. Measures over a grid of sizes and temperatures:
+
+    single spin attempts/s of twoDIsing.metropolisRun
+    sweeps/s (and attempts/s) of the checkerboard, bit packed, Wolff and Swendsen-Wang engines
+    throughput of hamiltonian/magnetisation (list lattice) and arrayHamiltonian/arrayMagnetisation
+    rendering cost per frame of lattice_to_image and lattice_to_rgb
+    1D diagonalisation time and peak traced memory (tracemalloc) against N for every backend
+
+Results are written as JSON, one record per measurement keyed by name. --baseline compares against an earlier results file
+and exits with status 1 if any metric got worse by more than --tolerance, so upgrades can be gated on the numbers.
+
+Example: python benchmarks.py --output bench.json
+         python benchmarks.py --quick --baseline bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+import twoDIsing as tDI
+import fastIsing as fI
+import bitIsing as bI
+import clusterIsing as cI
+import oneDIsing as oDI
+
+HIGHER_IS_BETTER={"attempts/s":True, "sweeps/s":True, "steps/s":True, "sites/s":True, "s/frame":False, "s":False, "MB":False}
+
+def timeIt(func, repeats:int=3)->float:
+    """
+    Return the best wall time in seconds of repeats calls of func
+    """
+    best=float("inf")
+    for r in range(repeats):
+        start=time.perf_counter()
+        func()
+        best=min(best,time.perf_counter()-start)
+    return best
+
+def record(results:list[dict], name:str, metric:str, value:float, **params):
+    results.append({"name":name, "metric":metric, "value":float(value), "params":params})
+
+def benchSingleSpin(results:list[dict], sizes:list[int], temps:list[float], attempts:int, repeats:int):
+    for N in sizes:
+        for T in temps:
+            seconds=timeIt(lambda: tDI.metropolisRun(N,1,T,0,attempts,None,1,stableLimit=attempts+1),repeats)
+            record(results,"single N="+str(N)+" T="+str(T),"attempts/s",(attempts+1)/seconds,N=N,T=T)
+
+def benchArrayEngines(results:list[dict], sizes:list[int], temps:list[float], sweeps:int, repeats:int):
+    for N in sizes:
+        for T in temps:
+            rng=np.random.default_rng(1)
+            lattice=fI.arrayGridGen(N,rng)
+            sites=fI.checkerboardSites(N)
+            table=fI.acceptanceArray(1,T,0)
+            seconds=timeIt(lambda: [fI.checkerboardSweep(lattice,rng,sites,table) for k in range(sweeps)],repeats)
+            record(results,"checkerboard N="+str(N)+" T="+str(T),"sweeps/s",sweeps/seconds,N=N,T=T)
+            record(results,"checkerboard attempts N="+str(N)+" T="+str(T),"attempts/s",sweeps*N*N/seconds,N=N,T=T)
+            if N%2==0:
+                packed=bI.packLattice(lattice)
+                colours=bI.colourMasks(N)
+                bitTable=tDI.acceptanceTable(1,T,0)
+                seconds=timeIt(lambda: [bI.packedSweep(N,packed,rng,colours,bitTable) for k in range(sweeps)],repeats)
+                record(results,"packed N="+str(N)+" T="+str(T),"sweeps/s",sweeps/seconds,N=N,T=T)
+            for algorithm in ("wolff","swendsenwang"):
+                step=cI.updater(N,1,T,0,lattice,rng,algorithm)
+                seconds=timeIt(lambda: [step() for k in range(sweeps)],repeats)
+                record(results,algorithm+" N="+str(N)+" T="+str(T),"steps/s",sweeps/seconds,N=N,T=T)
+
+def benchObservables(results:list[dict], sizes:list[int], calls:int, repeats:int):
+    for N in sizes:
+        rng=np.random.default_rng(1)
+        lattice=tDI.gridGen(N,rng)
+        array=fI.toArray(lattice)
+        seconds=timeIt(lambda: [tDI.hamiltonian(N,1,lattice) for k in range(calls)],repeats)
+        record(results,"hamiltonian N="+str(N),"sites/s",calls*N*N/seconds,N=N)
+        seconds=timeIt(lambda: [tDI.magnetisation(N,lattice) for k in range(calls)],repeats)
+        record(results,"magnetisation N="+str(N),"sites/s",calls*N*N/seconds,N=N)
+        seconds=timeIt(lambda: [fI.arrayHamiltonian(1,array) for k in range(calls)],repeats)
+        record(results,"arrayHamiltonian N="+str(N),"sites/s",calls*N*N/seconds,N=N)
+        seconds=timeIt(lambda: [fI.arrayMagnetisation(array) for k in range(calls)],repeats)
+        record(results,"arrayMagnetisation N="+str(N),"sites/s",calls*N*N/seconds,N=N)
+
+def benchRendering(results:list[dict], sizes:list[int], frames:int, repeats:int):
+    for N in sizes:
+        lattice=tDI.gridGen(N,np.random.default_rng(1))
+        seconds=timeIt(lambda: [tDI.lattice_to_rgb(lattice) for k in range(frames)],repeats)
+        record(results,"lattice_to_rgb N="+str(N),"s/frame",seconds/frames,N=N)
+        try:
+            import matplotlib
+        except ImportError:
+            continue
+        seconds=timeIt(lambda: [tDI.lattice_to_image(lattice) for k in range(frames)],repeats)
+        record(results,"lattice_to_image N="+str(N),"s/frame",seconds/frames,N=N)
+
+def benchChain(results:list[dict], sizes:dict[str,list[int]], repeats:int):
+    for backend,Ns in sizes.items():
+        for N in Ns:
+            solve=lambda: oDI.hamiltonian(N,1,0.5,verbosity=False,backend=backend,k=1)
+            seconds=timeIt(solve,repeats)
+            record(results,"chain "+backend+" N="+str(N),"s",seconds,N=N,backend=backend)
+            tracemalloc.start()
+            solve()
+            peak=tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            record(results,"chain memory "+backend+" N="+str(N),"MB",peak/2**20,N=N,backend=backend)
+
+def runSuite(quick:bool=False, progress:bool=True)->dict:
+    """
+    Run every benchmark and return {"machine": ..., "results": [records]}. quick shrinks the grid for a fast smoke run.
+    """
+    if quick:
+        grid={"single":[16], "array":[32,128], "temps":[2.27], "observables":[16,64], "render":[32],
+              "chain":{"dense":[6,8], "sparse":[8,12], "matrixfree":[8,12], "symmetry":[8,12]},
+              "attempts":20000, "sweeps":20, "calls":20, "frames":2, "repeats":2}
+    else:
+        grid={"single":[16,64], "array":[32,128,512], "temps":[1.5,2.27,3.5], "observables":[16,64,256], "render":[32,128],
+              "chain":{"dense":[6,8,10], "sparse":[10,14,18], "matrixfree":[10,14,18], "symmetry":[10,14,16]},
+              "attempts":200000, "sweeps":50, "calls":50, "frames":5, "repeats":3}
+    results=[]
+    stages=[("single spin",lambda: benchSingleSpin(results,grid["single"],grid["temps"],grid["attempts"],grid["repeats"])),
+            ("array engines",lambda: benchArrayEngines(results,grid["array"],grid["temps"],grid["sweeps"],grid["repeats"])),
+            ("observables",lambda: benchObservables(results,grid["observables"],grid["calls"],grid["repeats"])),
+            ("rendering",lambda: benchRendering(results,grid["render"],grid["frames"],grid["repeats"])),
+            ("1D chain",lambda: benchChain(results,grid["chain"],grid["repeats"]))]
+    for name,stage in stages:
+        if progress:
+            print("Benchmarking", name, "...", file=sys.stderr)
+        stage()
+    machine={"python":platform.python_version(), "numpy":np.__version__, "platform":platform.platform(), "processor":platform.processor()}
+    return {"machine":machine, "quick":quick, "results":results}
+
+def compare(current:dict, baseline:dict, tolerance:float=0.1)->list[dict]:
+    """
+    Compare two runSuite results record by record. Return one dict per record present in both, with the baseline and current
+    values, their ratio (current/baseline) and "regression" set where the metric got worse by more than tolerance.
+    """
+    old={r["name"]:r for r in baseline["results"]}
+    rows=[]
+    for r in current["results"]:
+        if r["name"] not in old or old[r["name"]]["value"]==0:
+            continue
+        ratio=r["value"]/old[r["name"]]["value"]
+        if HIGHER_IS_BETTER[r["metric"]]:
+            regression=ratio<1-tolerance
+        else:
+            regression=ratio>1+tolerance
+        rows.append({"name":r["name"], "metric":r["metric"], "baseline":old[r["name"]]["value"], "current":r["value"],
+                     "ratio":ratio, "regression":regression})
+    return rows
+
+def main(argv:list[str] | None =None)->int:
+    parser=argparse.ArgumentParser(description="Benchmark suite for the Ising model solvers")
+    parser.add_argument("--output",default="bench_results.json",help="Results file")
+    parser.add_argument("--quick",action="store_true",help="Small grid for a fast smoke run")
+    parser.add_argument("--baseline",help="Earlier results file to compare against")
+    parser.add_argument("--tolerance",type=float,default=0.1,help="Allowed relative slowdown before a metric counts as a regression")
+    args=parser.parse_args(argv)
+    current=runSuite(args.quick)
+    with open(args.output,"w") as f:
+        json.dump(current,f,indent=1)
+    print("Results written to", args.output)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        baseline=json.load(f)
+    rows=compare(current,baseline,args.tolerance)
+    for row in rows:
+        flag="REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<40} {row['metric']:<11} {row['baseline']:>12.4g} -> {row['current']:>12.4g}  x{row['ratio']:.2f} {flag}")
+    regressions=sum(row["regression"] for row in rows)
+    print(regressions, "regressions out of", len(rows), "compared metrics")
+    return 1 if regressions else 0
+
+if __name__=="__main__":
+    sys.exit(main())
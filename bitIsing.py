@@ -0,0 +1,204 @@
+"""
+Bit packed (multi-spin coded) lattice backend. Row i of an N x N lattice is stored in W=ceil(N/64) uint64 words,
+with column j held in bit j%64 of word j//64. A set bit is spin up (+1), a clear bit is spin down (-1), and the
+unused high bits of the last word are always kept clear. This takes one bit per spin instead of a Python int.
+"""
+import numpy as np
+import twoDIsing as tDI
+
+ALL_ONES=np.uint64(0xFFFFFFFFFFFFFFFF)
+EVEN_BITS=np.uint64(0x5555555555555555)
+ODD_BITS=np.uint64(0xAAAAAAAAAAAAAAAA)
+
+def popcount(words:np.ndarray)->int:
+    """
+    Return the total number of set bits in an array of uint64 words
+    """
+    if hasattr(np,"bitwise_count"):
+        return int(np.sum(np.bitwise_count(words),dtype=np.int64))
+    return int(np.sum(np.unpackbits(np.ascontiguousarray(words).view(np.uint8)),dtype=np.int64))
+
+def wordCount(N:int)->int:
+    return (N+63)//64
+
+def usedBits(N:int)->np.ndarray:
+    """
+    Return a row of W words with the bits of the N real columns set
+    """
+    W=wordCount(N)
+    mask=np.full(W,ALL_ONES,dtype=np.uint64)
+    if N%64:
+        mask[-1]=np.uint64((1<<(N%64))-1)
+    return mask
+
+def packLattice(lattice:list[list[int]] | np.ndarray)->np.ndarray:
+    """
+    Pack a +/-1 lattice (nested list or array) into the bit backend
+    """
+    spins=np.asarray(lattice)
+    N=spins.shape[1]
+    bits=np.zeros((spins.shape[0],wordCount(N)*64),dtype=np.uint8)
+    bits[:,:N]=spins>0
+    return np.packbits(bits,axis=1,bitorder="little").view("<u8").astype(np.uint64)
+
+def unpackLattice(N:int, packed:np.ndarray)->np.ndarray:
+    """
+    Unpack a bit lattice back into an N x N int8 array of +/-1 spins
+    """
+    bits=np.unpackbits(np.ascontiguousarray(packed.astype("<u8")).view(np.uint8),axis=1,bitorder="little")[:,:N]
+    return (2*bits.astype(np.int8)-1)
+
+def packedGridGen(N:int, rng:np.random.Generator | None =None)->np.ndarray:
+    """
+    Bit backend equivalent of twoDIsing.gridGen: a random N x N lattice of packed spins
+    """
+    if rng is None:
+        rng=np.random.default_rng()
+    words=rng.integers(0,2**64,size=(N,wordCount(N)),dtype=np.uint64,endpoint=False)
+    return words & usedBits(N)
+
+def rollColumns(N:int, packed:np.ndarray, shift:int)->np.ndarray:
+    """
+    Bit backend equivalent of np.roll(lattice, shift, axis=1) for shift=+1 or -1 (periodic in the N real columns)
+    """
+    last=(N-1)//64
+    lastBit=np.uint64((N-1)%64)
+    one=np.uint64(1)
+    out=np.empty_like(packed)
+    if shift==1:
+        wrapped=(packed[:,last]>>lastBit)&one
+        out[:]=packed<<one
+        out[:,1:]|=packed[:,:-1]>>np.uint64(63)
+        out[:,0]|=wrapped
+    else:
+        wrapped=packed[:,0]&one
+        out[:]=packed>>one
+        out[:,:-1]|=packed[:,1:]<<np.uint64(63)
+        out[:,last]|=wrapped<<lastBit
+    return out & usedBits(N)
+
+def antiAlignedPlanes(N:int, packed:np.ndarray)->list[np.ndarray]:
+    """
+    Return four bit planes (down, up, right and left neighbour) with a bit set wherever a site and that neighbour are anti-aligned
+    """
+    return [packed^np.roll(packed,-1,axis=0),
+            packed^np.roll(packed,1,axis=0),
+            packed^rollColumns(N,packed,-1),
+            packed^rollColumns(N,packed,1)]
+
+def packedHamiltonian(N:int, J:float, packed:np.ndarray, H:float=0)->float:
+    """
+    Bit backend equivalent of twoDIsing.hamiltonian. XOR with the right and lower neighbours marks the anti-aligned bonds,
+    so of the 2N^2 bonds, popcount of the XOR are anti-aligned and the rest aligned. H adds the field term -H*M.
+    """
+    anti=popcount(packed^np.roll(packed,-1,axis=0))+popcount(packed^rollColumns(N,packed,-1))
+    return float(-J*(2*N*N-2*anti)-H*packedMagnetisation(N,packed))
+
+def packedMagnetisation(N:int, packed:np.ndarray)->int:
+    """
+    Bit backend equivalent of twoDIsing.magnetisation
+    """
+    return 2*popcount(packed)-N*N
+
+def colourMasks(N:int)->list[np.ndarray]:
+    """
+    Return the two checkerboard sublattices as packed bit masks. Only even N can be two-coloured with periodic boundaries.
+    """
+    if N%2:
+        raise ValueError("The bit packed Metropolis update needs an even lattice size, got N="+str(N))
+    W=wordCount(N)
+    rowEven=np.where(np.arange(N)%2==0,EVEN_BITS,ODD_BITS).astype(np.uint64)
+    rowOdd=np.where(np.arange(N)%2==0,ODD_BITS,EVEN_BITS).astype(np.uint64)
+    used=usedBits(N)
+    mask0=(np.repeat(rowEven[:,None],W,axis=1))&used
+    mask1=(np.repeat(rowOdd[:,None],W,axis=1))&used
+    return [mask0,mask1]
+
+def packedSweep(N:int, packed:np.ndarray, rng:np.random.Generator, masks:list[np.ndarray], table:dict[tuple[int,int],float], rowChunk:int=256)->int:
+    """
+    Perform one checkerboard Metropolis sweep of a bit lattice in place.
+    The number of anti-aligned neighbours a of every site is added up bitwise from the four XOR planes into three bit planes,
+    which with the spin bit sorts each site into one of ten (s, a) classes. Classes that always flip are accepted bitwise,
+    and only the classes with 0<p<1 need random numbers, which are drawn rowChunk rows at a time to keep memory flat.
+    table is twoDIsing.acceptanceTable. Return the number of accepted flips.
+    """
+    accepted=0
+    for mask in masks:
+        x1,x2,x3,x4=antiAlignedPlanes(N,packed)
+        s1=x1^x2
+        c1=x1&x2
+        s2=x3^x4
+        c2=x3&x4
+        b0=s1^s2
+        carry=s1&s2
+        b1=c1^c2^carry
+        b2=(c1&c2)|(carry&(c1|c2))
+        planes=[]
+        for a in range(5):
+            cls=(b0 if a&1 else ~b0)&(b1 if a&2 else ~b1)&(b2 if a&4 else ~b2)
+            for s in (-1,1):
+                spinBits=packed if s==1 else ~packed
+                planes.append((table[(s,s*(4-2*a))],cls&spinBits&mask))
+        accept=np.zeros_like(packed)
+        random=[]
+        for p,cls in planes:
+            if p>=1:
+                accept|=cls
+            elif p>0:
+                random.append((p,cls))
+        if random:
+            start=0
+            while start<N:
+                stop=min(start+rowChunk,N)
+                u=rng.random((stop-start,packed.shape[1]*64))
+                for p,cls in random:
+                    bern=np.packbits(u<p,axis=1,bitorder="little").view("<u8").astype(np.uint64)
+                    accept[start:stop]|=cls[start:stop]&bern
+                start=stop
+        packed^=accept
+        accepted+=popcount(accept)
+    return accepted
+
+def packedMetropolis(N:int, J:float, T:float, H:float=0, maxIters:int=1000, lattice:np.ndarray | list[list[int]] | None =None, seed:int | None =None, monitor=None, metrics=None):
+    """
+    Bit backend counterpart of fastIsing.checkerboardMetropolis. maxIters counts full sweeps and the run stops early once
+    a sweep accepts no flips (or once monitor is satisfied, as there). metrics is recorded as there too. lattice may be a packed lattice or a +/-1 lattice, which is packed first.
+
+    Return (packed lattice, energies, magnetisations) with the energy and magnetisation recorded after every sweep.
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    rng=np.random.default_rng(seed)
+    if lattice is None:
+        packed=packedGridGen(N,rng)
+    elif np.asarray(lattice).dtype==np.uint64:
+        packed=np.array(lattice,dtype=np.uint64)
+    else:
+        packed=packLattice(lattice)
+    masks=colourMasks(N)
+    table=tDI.acceptanceTable(J,T,H)
+    energies=[]
+    magnetisations=[]
+    sweeps=0
+    while sweeps<maxIters:
+        if metrics is None:
+            accepted=packedSweep(N,packed,rng,masks,table)
+            energies.append(packedHamiltonian(N,J,packed,H))
+            magnetisations.append(packedMagnetisation(N,packed))
+        else:
+            with metrics.phase("kernel"):
+                accepted=packedSweep(N,packed,rng,masks,table)
+            with metrics.phase("observables"):
+                energies.append(packedHamiltonian(N,J,packed,H))
+                magnetisations.append(packedMagnetisation(N,packed))
+            metrics.count("sweeps")
+            metrics.count("attempts",N*N)
+            metrics.count("accepts",accepted)
+            metrics.tick(sweeps,energies[-1],magnetisations[-1])
+        sweeps+=1
+        if monitor is not None:
+            if monitor.add(energies[-1],magnetisations[-1]):
+                break
+        elif accepted==0:
+            break
+    return packed, energies, magnetisations
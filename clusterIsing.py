@@ -0,0 +1,164 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.special import expit
+import fastIsing as fI
+
+def neighbourTable(N:int)->np.ndarray:
+    """
+    Return an (N^2, 4) array holding the flat indices of the down, up, right and left neighbours of every site
+    of an N x N periodic lattice
+    """
+    ii,jj=np.indices((N,N))
+    return np.stack([((ii+1)%N*N+jj).ravel(),
+                     ((ii-1)%N*N+jj).ravel(),
+                     (ii*N+(jj+1)%N).ravel(),
+                     (ii*N+(jj-1)%N).ravel()],axis=1)
+
+def bondProbability(J:float, T:float)->float:
+    """
+    Return the Fortuin-Kasteleyn probability p=1-exp(-2|J|/T) of activating a satisfied bond
+    """
+    if T<=0:
+        return 1.0
+    return float(-np.expm1(-2*abs(J)/T))
+
+def wolffStep(lattice:np.ndarray, J:float, T:float, H:float, rng:np.random.Generator, neighbours:np.ndarray, pAdd:float)->int:
+    """
+    Grow one Wolff cluster from a random seed site and flip it in place.
+    The cluster is grown a whole frontier at a time: every bond from the newest sites to unvisited neighbours
+    is tested at once. With a field H the finished cluster is only flipped with the Metropolis probability
+    of its field energy change 2*H*M_cluster.
+    Return the number of spins flipped (0 if the field rejected the cluster).
+    """
+    spins=lattice.reshape(-1)
+    seed=int(rng.integers(spins.size))
+    inCluster=np.zeros(spins.size,dtype=bool)
+    inCluster[seed]=True
+    frontier=np.array([seed])
+    while frontier.size>0:
+        candidates=neighbours[frontier].ravel()
+        origins=np.repeat(frontier,neighbours.shape[1])
+        satisfied=(J*spins[candidates]*spins[origins]>0) & ~inCluster[candidates]
+        added=candidates[satisfied & (rng.random(candidates.size)<pAdd)]
+        frontier=np.unique(added)
+        inCluster[frontier]=True
+    clusterMag=int(np.sum(spins[inCluster],dtype=np.int64))
+    dE=2*H*clusterMag
+    if dE>0 and (T<=0 or rng.random()>=np.exp(-dE/T)):
+        return 0
+    spins[inCluster]*=-1
+    return int(np.count_nonzero(inCluster))
+
+def swendsenWangStep(lattice:np.ndarray, J:float, T:float, H:float, rng:np.random.Generator, neighbours:np.ndarray, pAdd:float)->int:
+    """
+    Perform one Swendsen-Wang update of the whole lattice in place.
+    Satisfied bonds are activated with probability pAdd, clusters are labelled with a sparse connected components
+    search (which handles the periodic wrap), and every cluster is flipped with its heat bath probability
+    1/(1+exp(2*H*M_cluster/T)), i.e. one half when H=0.
+    Return the number of clusters.
+    """
+    spins=lattice.reshape(-1)
+    sites=np.arange(spins.size)
+    rows=[]
+    cols=[]
+    for k in (0,2):
+        other=neighbours[:,k]
+        active=(J*spins*spins[other]>0) & (rng.random(spins.size)<pAdd)
+        rows.append(sites[active])
+        cols.append(other[active])
+    rows=np.concatenate(rows)
+    cols=np.concatenate(cols)
+    graph=coo_matrix((np.ones(rows.size,dtype=np.int8),(rows,cols)),shape=(spins.size,spins.size))
+    nClusters,labels=connected_components(graph,directed=False)
+    clusterMags=np.bincount(labels,weights=spins,minlength=nClusters)
+    if T>0:
+        flipProb=expit(-2*H*clusterMags/T)
+    else:
+        flipProb=np.where(H*clusterMags<0,1.0,np.where(H*clusterMags>0,0.0,0.5))
+    flip=rng.random(nClusters)<flipProb
+    spins[flip[labels]]*=-1
+    return nClusters
+
+def clusterMetropolis(N:int, J:float, T:float, H:float=0, maxIters:int=1000, lattice:np.ndarray | list[list[int]] | None =None, seed:int | None =None, algorithm:str="wolff", monitor=None, metrics=None, flipLog=None):
+    """
+    Cluster update counterpart of fastIsing.checkerboardMetropolis, for runs near the critical temperature T~2.269J
+    where single spin flips suffer critical slowing down.
+    algorithm="wolff" flips one cluster per iteration, algorithm="swendsenwang" updates every cluster of the lattice per iteration.
+    A monitor (equilibration.EquilibrationMonitor) fed every iteration ends the run early once it is satisfied.
+    metrics (an instrumentation.Metrics) records the kernel and observables time, the steps and the spins flipped (Wolff)
+    or clusters formed (Swendsen-Wang). flipLog (a flipLog.FlipLog) logs the spins flipped by every iteration.
+
+    Return (lattice, energies, magnetisations) with the energy and magnetisation recorded after every iteration.
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    if algorithm=="wolff":
+        step=wolffStep
+    elif algorithm=="swendsenwang":
+        step=swendsenWangStep
+    else:
+        raise ValueError("Unknown cluster algorithm: "+str(algorithm))
+    rng=np.random.default_rng(seed)
+    if lattice is None:
+        lattice=fI.arrayGridGen(N,rng)
+    else:
+        lattice=fI.toArray(lattice)
+    neighbours=neighbourTable(N)
+    pAdd=bondProbability(J,T)
+    energies=[]
+    magnetisations=[]
+    iters=0
+    if flipLog is not None:
+        flipLog.begin(lattice)
+    while iters<maxIters:
+        if metrics is None:
+            step(lattice,J,T,H,rng,neighbours,pAdd)
+            energies.append(fI.arrayHamiltonian(J,lattice,H))
+            magnetisations.append(fI.arrayMagnetisation(lattice))
+        else:
+            with metrics.phase("kernel"):
+                size=step(lattice,J,T,H,rng,neighbours,pAdd)
+            with metrics.phase("observables"):
+                energies.append(fI.arrayHamiltonian(J,lattice,H))
+                magnetisations.append(fI.arrayMagnetisation(lattice))
+            metrics.count("steps")
+            metrics.count("flipped" if algorithm=="wolff" else "clusters",size)
+            metrics.tick(iters,energies[-1],magnetisations[-1])
+        if flipLog is not None:
+            flipLog.record(iters,lattice)
+        iters+=1
+        if monitor is not None and monitor.add(energies[-1],magnetisations[-1]):
+            break
+    if flipLog is not None:
+        flipLog.close(iters-1,lattice)
+    return lattice, energies, magnetisations
+
+def updater(N:int, J:float, T:float, H:float, lattice:np.ndarray, rng:np.random.Generator, algorithm:str="metropolis"):
+    """
+    Return a function that advances lattice in place by one iteration of algorithm ("metropolis" for a checkerboard sweep,
+    "wolff" or "swendsenwang"), for callers that drive the updates themselves and never stop early
+    """
+    if algorithm=="metropolis":
+        sites=fI.checkerboardSites(N)
+        table=fI.acceptanceArray(J,T,H)
+        return lambda: fI.checkerboardSweep(lattice,rng,sites,table)
+    if algorithm=="wolff":
+        step=wolffStep
+    elif algorithm=="swendsenwang":
+        step=swendsenWangStep
+    else:
+        raise ValueError("Unknown cluster algorithm: "+str(algorithm))
+    neighbours=neighbourTable(N)
+    pAdd=bondProbability(J,T)
+    return lambda: step(lattice,J,T,H,rng,neighbours,pAdd)
+
+def simulate(N:int, J:float, T:float, H:float=0, maxIters:int=1000, lattice:np.ndarray | list[list[int]] | None =None, seed:int | None =None, algorithm:str="metropolis", monitor=None, metrics=None, flipLog=None):
+    """
+    Run the array based solver picked by algorithm: "metropolis" (checkerboard sweeps), "wolff" or "swendsenwang".
+    All three share the same parameters (including the optional equilibration monitor, instrumentation metrics and
+    flip log) and return (lattice, energies, magnetisations).
+    """
+    if algorithm=="metropolis":
+        return fI.checkerboardMetropolis(N,J,T,H,maxIters,lattice,seed,monitor,metrics,flipLog)
+    return clusterMetropolis(N,J,T,H,maxIters,lattice,seed,algorithm,monitor,metrics,flipLog)
@@ -0,0 +1,159 @@
+import numpy as np
+
+def autocorrelation(x:list[float] | np.ndarray)->np.ndarray:
+    """
+    Return the normalised autocorrelation function rho(t) of a time series, computed with an FFT in O(n log n).
+    A constant series has no fluctuations to correlate, so rho is taken as 1 at t=0 and 0 elsewhere.
+    """
+    x=np.asarray(x,dtype=float)
+    n=x.size
+    x=x-x.mean()
+    f=np.fft.rfft(x,2*n)
+    acf=np.fft.irfft(f*np.conj(f))[:n]
+    if acf[0]<=0:
+        rho=np.zeros(n)
+        rho[0]=1.0
+        return rho
+    return acf/acf[0]
+
+def integratedAutocorrelationTime(x:list[float] | np.ndarray, c:float=5.0)->float:
+    """
+    Return the integrated autocorrelation time tau=1/2+sum_t rho(t) of a time series, summed up to the automatic window of
+    Sokal: the smallest W with W >= c*tau(W). Successive samples are then worth one independent sample every 2*tau steps.
+    """
+    x=np.asarray(x,dtype=float)
+    if x.size<2:
+        return 0.5
+    rho=autocorrelation(x)
+    taus=0.5+np.cumsum(rho[1:])
+    windows=np.arange(1,x.size)
+    good=windows>=c*taus
+    W=int(np.argmax(good)) if good.any() else taus.size-1
+    return float(max(taus[W],0.5))
+
+class EquilibrationMonitor:
+    """
+    Online equilibration detector for the 2D solvers. Feed it one (energy, magnetisation) sample per sweep with add; it
+    returns True once the run can stop. Nothing but running block sums is kept, so every sample costs O(1) however long
+    the run: the per-site E, E^2, |M| and M^2 go into blocks of size s, and once 2*blocks blocks are full neighbouring pairs
+    are merged, leaving blocks blocks of size 2s.
+
+    Each time the number of samples doubles the burn-in b is picked, out of the first half of the blocks, as the one
+    leaving the most effectively independent samples (n-b)/(2*tau), with tau=s*var(block means)/(2*var(samples)): an
+    unequilibrated transient inflates tau, so cutting it pays off. Every checkEvery samples the run counts as equilibrated
+    when the means of the last recentBlocks blocks after b all lie within three block errors of their overall mean, for
+    both E and |M|; a series still drifting has its latest blocks off to one side.
+    Once equilibrated, the run stops when the error of the mean per site of both E and |M| is below targetError, the
+    measurement window is at least minTaus autocorrelation times long and the blocks are at least 5*tau long (shorter
+    blocks are still correlated with each other and underestimate tau).
+    """
+    def __init__(self, sites:int, targetError:float=0.005, minSamples:int=100, checkEvery:int=50, minTaus:float=20, blocks:int=32, recentBlocks:int=3):
+        self.sites=sites
+        self.blocks=max(4,blocks)
+        self.recentBlocks=min(max(1,recentBlocks),self.blocks//2)
+        self.targetError=targetError
+        self.minSamples=minSamples
+        self.checkEvery=max(1,checkEvery)
+        self.minTaus=minTaus
+        self.sums=np.zeros((2*self.blocks,4))
+        self.full=0
+        self.size=1
+        self.current=[0.0,0.0,0.0,0.0]
+        self.count=0
+        self.samples=0
+        self.burnIn=0
+        self.nextScan=max(2,minSamples)
+        self.equilibrated=False
+        self.done=False
+        self.result={}
+
+    def add(self, energy:float, mag:float)->bool:
+        """
+        Record one sample and return True once equilibrium is reached and the target error is met
+        """
+        e=energy/self.sites
+        m=abs(mag)/self.sites
+        current=self.current
+        current[0]+=e
+        current[1]+=e*e
+        current[2]+=m
+        current[3]+=m*m
+        self.count+=1
+        self.samples+=1
+        if self.count==self.size:
+            self.sums[self.full]=current
+            self.full+=1
+            self.current=[0.0,0.0,0.0,0.0]
+            self.count=0
+            if self.full==2*self.blocks:
+                self.sums[:self.blocks]=self.sums.reshape(self.blocks,2,4).sum(axis=1)
+                self.sums[self.blocks:]=0
+                self.full=self.blocks
+                self.size*=2
+        if self.samples>=self.minSamples and self.samples%self.checkEvery==0:
+            self.evaluate(self.samples>=self.nextScan)
+        return self.done
+
+    def blockStatistics(self, first:int)->tuple[np.ndarray,np.ndarray,float,float]:
+        """
+        Return the block means of E and |M| over the complete blocks from index first on, and their tau estimates
+        """
+        sums=self.sums[first:self.full]
+        means=sums/self.size
+        taus=[]
+        for col in (0,2):
+            var=means[:,col+1].mean()-means[:,col].mean()**2
+            if sums.shape[0]<2 or var<=0:
+                taus.append(0.5)
+            else:
+                taus.append(max(0.5,float(self.size*np.var(means[:,col],ddof=1)/(2*var))))
+        return means[:,0], means[:,2], taus[0], taus[1]
+
+    def blocksAgree(self, means:np.ndarray)->bool:
+        """
+        Return True when the last recentBlocks block means lie within three block errors of the mean of them all. The
+        block error comes from the differences of neighbouring blocks, so a slow drift, which would inflate the spread of
+        the block means, does not hide itself.
+        """
+        if means.size<self.recentBlocks+2:
+            return False
+        err=np.sqrt(np.mean(np.diff(means)**2)/2)
+        return bool(np.all(np.abs(means[-self.recentBlocks:]-means.mean())<=3*err+1e-12))
+
+    def evaluate(self, scan:bool=True)->dict:
+        """
+        Run the error tests on the samples so far, first re-picking the burn-in if scan. Return the summary (also kept in
+        result): burnIn, tauE, tauM, the per-site meanE/errE and meanM/errM (of |M|), and spacing=ceil(2*tau), the
+        number of samples between effectively independent measurements.
+        """
+        if scan:
+            best=-1.0
+            for first in range(self.full//2+1):
+                tE,tM=self.blockStatistics(first)[2:]
+                effective=(self.full-first)*self.size/(2*max(tE,tM))
+                if effective>best:
+                    best=effective
+                    self.burnIn=first*self.size
+            while self.nextScan<=self.samples:
+                self.nextScan*=2
+        first=min(-(-self.burnIn//self.size),self.full//2)
+        E,M,tauE,tauM=self.blockStatistics(first)
+        b=first*self.size
+        tau=max(tauE,tauM)
+        error=lambda x: float(np.std(x,ddof=1)/np.sqrt(x.size)) if x.size>1 else float("inf")
+        self.equilibrated=self.blocksAgree(E) and self.blocksAgree(M)
+        self.result={"burnIn":b, "tauE":tauE, "tauM":tauM,
+                     "meanE":float(E.mean()), "errE":error(E),
+                     "meanM":float(M.mean()), "errM":error(M),
+                     "spacing":int(np.ceil(2*tau)), "samples":self.samples, "equilibrated":self.equilibrated}
+        self.done=(self.equilibrated and self.result["errE"]<=self.targetError and self.result["errM"]<=self.targetError
+                   and self.full*self.size-b>=self.minTaus*tau and self.size>=5*tau)
+        return self.result
+
+    def summary(self)->dict:
+        """
+        Return the latest evaluation, re-running it so it covers every sample added so far
+        """
+        if self.full<2:
+            return {"samples":self.samples, "equilibrated":False}
+        return self.evaluate()
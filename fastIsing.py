@@ -0,0 +1,238 @@
+import numpy as np
+import twoDIsing as tDI
+
+def arrayGridGen(N:int, rng:np.random.Generator | None =None)->np.ndarray:
+    """
+    Generate a 2D lattice of random spins stored as an N x N int8 array. Use dimensionless spin +/-1 for up/down.
+    """
+    if rng is None:
+        rng=np.random.default_rng()
+    return rng.choice(np.array([-1,1],dtype=np.int8),size=(N,N))
+
+def toArray(lattice:list[list[int]] | np.ndarray)->np.ndarray:
+    """
+    Convert a nested list lattice (as made by twoDIsing.gridGen) into an int8 array lattice
+    """
+    return np.ascontiguousarray(lattice,dtype=np.int8)
+
+def neighbourSum(lattice:np.ndarray)->np.ndarray:
+    """
+    Return the sum of the four nearest neighbours of every site, using periodic boundary conditions
+    """
+    return (np.roll(lattice,1,axis=0)+np.roll(lattice,-1,axis=0)
+            +np.roll(lattice,1,axis=1)+np.roll(lattice,-1,axis=1))
+
+def arrayHamiltonian(J:float, lattice:np.ndarray, H:float=0)->float:
+    """
+    Return the Ising energy of an array lattice with coupling strength J under an external field H.
+    Each bond is counted once by pairing every site with its right and lower neighbour (periodic boundaries).
+    """
+    s=lattice.astype(np.int64)
+    bonds=np.sum(s*np.roll(s,-1,axis=1))+np.sum(s*np.roll(s,-1,axis=0))
+    return float(-J*bonds-H*np.sum(s))
+
+def arrayMagnetisation(lattice:np.ndarray)->int:
+    """
+    Return the magnetisation of an array lattice
+    """
+    return int(np.sum(lattice,dtype=np.int64))
+
+def sublatticeMasks(N:int)->list[np.ndarray]:
+    """
+    Split an N x N periodic lattice into sublattices with no two neighbouring sites in the same sublattice.
+    Even N gives the usual two-colour checkerboard. Odd N cannot be two-coloured across the periodic seam,
+    so the last row and column get two colours of their own and the corner site joins colour 0.
+    """
+    ii,jj=np.indices((N,N))
+    colours=(ii+jj)%2
+    if N%2==1:
+        colours[N-1,:]=2+np.arange(N)%2
+        colours[:,N-1]=2+np.arange(N)%2
+        colours[N-1,N-1]=0
+    return [colours==c for c in np.unique(colours)]
+
+def acceptanceArray(J:float, T:float, H:float=0)->np.ndarray:
+    """
+    Return twoDIsing.acceptanceTable as a 2 x 5 array indexed by [(s+1)//2, (f+4)//2] for vectorised lookups
+    """
+    table=tDI.acceptanceTable(J,T,H)
+    out=np.zeros((2,5))
+    for (s,f),p in table.items():
+        out[(s+1)//2,(f+4)//2]=p
+    return out
+
+def checkerboardSites(N:int)->list[tuple[np.ndarray,np.ndarray]] | None:
+    """
+    Return what checkerboardSweep needs to update an N x N lattice: None for even N, where it works on strided views,
+    otherwise the gather indices of sublatticeSites
+    """
+    return None if N%2==0 else sublatticeSites(N)
+
+def checkerboardSweep(lattice:np.ndarray, rng:np.random.Generator, sites:list[tuple[np.ndarray,np.ndarray]] | None, table:np.ndarray)->int:
+    """
+    Perform one Metropolis sweep of an array lattice in place, updating a whole sublattice at a time.
+    Sites in one sublattice share no neighbours, so all of their flips can be decided at once from the same neighbour sums.
+    Only the sites being updated get neighbour sums and random numbers: for even N (sites=None) the lattice is split into
+    four strided quarter views (even/odd rows and columns), whose neighbours are rolls of the other quarters; for odd N
+    sites (from checkerboardSites) holds the gather indices of each sublattice. table is the acceptance array from
+    acceptanceArray. Return the number of accepted flips.
+    """
+    flatTable=table.reshape(-1)
+    def update(spins:np.ndarray, f:np.ndarray)->int:
+        accept=rng.random(spins.shape)<flatTable[5*((spins+1)//2)+(f+4)//2]
+        spins[accept]*=-1
+        return int(np.count_nonzero(accept))
+    if sites is None:
+        A=lattice[0::2,0::2]
+        B=lattice[1::2,1::2]
+        C=lattice[0::2,1::2]
+        D=lattice[1::2,0::2]
+        accepted=update(A,D+np.roll(D,1,axis=0)+C+np.roll(C,1,axis=1))
+        accepted+=update(B,C+np.roll(C,-1,axis=0)+D+np.roll(D,-1,axis=1))
+        accepted+=update(C,B+np.roll(B,1,axis=0)+A+np.roll(A,-1,axis=1))
+        accepted+=update(D,A+np.roll(A,-1,axis=0)+B+np.roll(B,1,axis=1))
+        return accepted
+    spins=lattice.reshape(-1)
+    accepted=0
+    for idx,neighbours in sites:
+        s=spins[idx]
+        accept=rng.random(idx.size)<flatTable[5*((s+1)//2)+(spins[neighbours].sum(axis=1,dtype=np.int8)+4)//2]
+        spins[idx[accept]]*=-1
+        accepted+=int(np.count_nonzero(accept))
+    return accepted
+
+def checkerboardMetropolis(N:int, J:float, T:float, H:float=0, maxIters:int=1000, lattice:np.ndarray | list[list[int]] | None =None, seed:int | None =None, monitor=None, metrics=None, flipLog=None):
+    """
+    Vectorised counterpart of twoDIsing.metropolisFlips and twoDIsing_MagField.metropolisMagnetisation.
+    Here maxIters counts full sweeps (N^2 attempted flips each) rather than single spin attempts.
+    The run stops early once a whole sweep goes by without a single accepted flip, or, when a monitor
+    (equilibration.EquilibrationMonitor) is passed, once it reports equilibrium and its target error instead.
+    metrics (an instrumentation.Metrics) records the kernel and observables time, sweeps, attempts and accepts.
+    flipLog (a flipLog.FlipLog) logs the flipped sites of every sweep, with sweeps as its iterations.
+
+    Return (lattice, energies, magnetisations) with the energy and magnetisation recorded after every sweep.
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    rng=np.random.default_rng(seed)
+    if lattice is None:
+        lattice=arrayGridGen(N,rng)
+    else:
+        lattice=toArray(lattice)
+    sites=checkerboardSites(N)
+    table=acceptanceArray(J,T,H)
+    energies=[]
+    magnetisations=[]
+    sweeps=0
+    if flipLog is not None:
+        flipLog.begin(lattice)
+    while sweeps<maxIters:
+        if metrics is None:
+            accepted=checkerboardSweep(lattice,rng,sites,table)
+            energies.append(arrayHamiltonian(J,lattice,H))
+            magnetisations.append(arrayMagnetisation(lattice))
+        else:
+            with metrics.phase("kernel"):
+                accepted=checkerboardSweep(lattice,rng,sites,table)
+            with metrics.phase("observables"):
+                energies.append(arrayHamiltonian(J,lattice,H))
+                magnetisations.append(arrayMagnetisation(lattice))
+            metrics.count("sweeps")
+            metrics.count("attempts",N*N)
+            metrics.count("accepts",accepted)
+            metrics.tick(sweeps,energies[-1],magnetisations[-1])
+        if flipLog is not None:
+            flipLog.record(sweeps,lattice)
+        sweeps+=1
+        if monitor is not None:
+            if monitor.add(energies[-1],magnetisations[-1]):
+                break
+        elif accepted==0:
+            break
+    if flipLog is not None:
+        flipLog.close(sweeps-1,lattice)
+    return lattice, energies, magnetisations
+
+def batchGridGen(R:int, N:int, rng:np.random.Generator | None =None)->np.ndarray:
+    """
+    Generate R independent random lattices as one (R, N, N) int8 array
+    """
+    if rng is None:
+        rng=np.random.default_rng()
+    return rng.choice(np.array([-1,1],dtype=np.int8),size=(R,N,N))
+
+def batchAcceptanceArray(J:float, temps:list[float], H:float | list[float]=0)->np.ndarray:
+    """
+    Stack acceptanceArray for every replica into an (R, 2, 5) array. H is one field for all replicas or one per replica.
+    """
+    Hs=np.broadcast_to(np.asarray(H,dtype=float),(len(temps),))
+    return np.stack([acceptanceArray(J,T,h) for T,h in zip(temps,Hs)])
+
+def batchHamiltonian(J:float, lattices:np.ndarray, H:float | np.ndarray=0)->np.ndarray:
+    """
+    Return the energy of every lattice of an (R, N, N) batch as an (R,) array, H being scalar or one field per replica
+    """
+    s=lattices.astype(np.int64)
+    bonds=np.sum(s*np.roll(s,-1,axis=2),axis=(1,2))+np.sum(s*np.roll(s,-1,axis=1),axis=(1,2))
+    return -J*bonds-np.asarray(H,dtype=float)*np.sum(s,axis=(1,2))
+
+def batchMagnetisation(lattices:np.ndarray)->np.ndarray:
+    return np.sum(lattices,axis=(1,2),dtype=np.int64)
+
+def sublatticeSites(N:int)->list[tuple[np.ndarray,np.ndarray]]:
+    """
+    Return the sublattices of sublatticeMasks as (flat site indices, (sites, 4) flat indices of their neighbours) pairs
+    """
+    index=np.arange(N*N).reshape(N,N)
+    neighbours=np.stack([np.roll(index,-1,axis=0),np.roll(index,1,axis=0),np.roll(index,-1,axis=1),np.roll(index,1,axis=1)],axis=-1).reshape(-1,4)
+    return [(np.flatnonzero(mask),neighbours[np.flatnonzero(mask)]) for mask in sublatticeMasks(N)]
+
+def batchSweep(lattices:np.ndarray, rng:np.random.Generator, sites:list[tuple[np.ndarray,np.ndarray]], tables:np.ndarray)->np.ndarray:
+    """
+    Batched checkerboardSweep: one Metropolis sweep of every lattice of an (R, N, N) batch in place, with replica r using
+    the acceptance array tables[r] (see batchAcceptanceArray). sites comes from sublatticeSites; gathering only the sites
+    of the current sublattice and their neighbours halves the work of whole-lattice rolls.
+    Return the number of accepted flips per replica.
+    """
+    R=lattices.shape[0]
+    spins=lattices.reshape(R,-1)
+    offset=(10*np.arange(R,dtype=np.intp))[:,None]
+    flatTables=tables.reshape(-1)
+    accepted=np.zeros(R,dtype=np.int64)
+    for idx,neighbours in sites:
+        s=spins[:,idx]
+        f=spins[:,neighbours].sum(axis=2,dtype=np.int8)
+        accept=rng.random(s.shape)<flatTables[offset+5*((s+1)//2)+(f+4)//2]
+        spins[:,idx]=np.where(accept,-s,s)
+        accepted+=np.count_nonzero(accept,axis=1)
+    return accepted
+
+def batchMetropolis(N:int, J:float, temps:list[float], H:float | list[float]=0, maxIters:int=1000, lattices:np.ndarray | None =None, seed:int | None =None):
+    """
+    Advance R=len(temps) independent N x N lattices together as one (R, N, N) array, replica r at temperature temps[r]
+    and field H[r] (or a shared H). For small lattices this replaces R separate runs, whose cost is mostly Python overhead,
+    with one array workload. maxIters counts sweeps; unlike checkerboardMetropolis there is no early stop, since the
+    replicas settle at different times.
+
+    Return (lattices, energies, magnetisations) where energies and magnetisations are (sweeps, R) arrays recorded after
+    every sweep.
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    rng=np.random.default_rng(seed)
+    if lattices is None:
+        lattices=batchGridGen(len(temps),N,rng)
+    else:
+        lattices=np.ascontiguousarray(lattices,dtype=np.int8)
+    Hs=np.broadcast_to(np.asarray(H,dtype=float),(len(temps),))
+    sites=sublatticeSites(N)
+    tables=batchAcceptanceArray(J,temps,Hs)
+    energies=np.empty((maxIters,len(temps)))
+    magnetisations=np.empty((maxIters,len(temps)),dtype=np.int64)
+    sweeps=0
+    while sweeps<maxIters:
+        batchSweep(lattices,rng,sites,tables)
+        energies[sweeps]=batchHamiltonian(J,lattices,Hs)
+        magnetisations[sweeps]=batchMagnetisation(lattices)
+        sweeps+=1
+    return lattices, energies, magnetisations
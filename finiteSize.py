@@ -0,0 +1,126 @@
+"""
+Finite size scaling batch runner. Every (N, T) point of a grid is an independent run whose moments <E>, <E^2>, <|M|>, <M^2>
+and <M^4> are accumulated on the fly (nothing is stored per sample). The specific heat, susceptibility and Binder cumulant
+follow from the moments, with jackknife errors over blocks of the run. Jobs are handed to the worker processes largest N
+first so the long runs do not end up as stragglers, and all points are written to one tidy CSV file (one row per point).
+"""
+import csv
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import fastIsing as fI
+import clusterIsing as cI
+
+MOMENTS=["E","E2","absM","M2","M4"]
+
+class MomentAccumulator:
+    """
+    Streaming (Welford style) means of the five moments, kept separately for each of nBlocks consecutive blocks of samples
+    so that jackknife errors can be formed at the end without storing the samples.
+    """
+    def __init__(self, nBlocks:int, blockSize:int):
+        self.nBlocks=nBlocks
+        self.blockSize=max(1,blockSize)
+        self.means=np.zeros((nBlocks,len(MOMENTS)))
+        self.counts=np.zeros(nBlocks,dtype=np.int64)
+        self.samples=0
+
+    def add(self, energy:float, mag:float):
+        b=min(self.samples//self.blockSize,self.nBlocks-1)
+        M2=mag*mag
+        x=np.array([energy,energy*energy,abs(mag),M2,M2*M2])
+        self.counts[b]+=1
+        self.means[b]+=(x-self.means[b])/self.counts[b]
+        self.samples+=1
+
+    def jackknifeMeans(self)->tuple[np.ndarray,np.ndarray]:
+        """
+        Return (full means, leave-one-block-out means) of the five moments, skipping empty blocks
+        """
+        used=self.counts>0
+        counts=self.counts[used]
+        means=self.means[used]
+        total=counts.sum()
+        full=(counts[:,None]*means).sum(axis=0)/total
+        if counts.size<2:
+            return full, full[None,:]
+        leaveOut=(total*full-counts[:,None]*means)/(total-counts)[:,None]
+        return full, leaveOut
+
+def derived(moments:np.ndarray, sites:int, T:float)->np.ndarray:
+    """
+    Return [e, |m|, C, chi, U] per site from the moments <E>, <E^2>, <|M|>, <M^2>, <M^4> (rows of moments may be stacked)
+    """
+    E,E2,absM,M2,M4=np.moveaxis(np.atleast_2d(moments),-1,0)
+    C=(E2-E*E)/(sites*T*T)
+    chi=(M2-absM*absM)/(sites*T)
+    with np.errstate(divide="ignore",invalid="ignore"):
+        U=1-M4/(3*M2*M2)
+    return np.stack([E/sites,absM/sites,C,chi,U],axis=-1)
+
+def jackknife(acc:MomentAccumulator, sites:int, T:float)->tuple[np.ndarray,np.ndarray]:
+    """
+    Return the derived quantities (see derived) and their jackknife errors
+    """
+    full,leaveOut=acc.jackknifeMeans()
+    value=derived(full,sites,T)[0]
+    samples=derived(leaveOut,sites,T)
+    n=samples.shape[0]
+    if n<2:
+        return value, np.full(value.size,np.nan)
+    error=np.sqrt((n-1)/n*np.sum((samples-samples.mean(axis=0))**2,axis=0))
+    return value, error
+
+def pointWorker(args)->dict:
+    """
+    Simulate one (N, T) point in a worker process and return its row of results
+    """
+    N,J,T,sweeps,burnIn,algorithm,blocks,seed=args
+    rng=np.random.default_rng(seed)
+    lattice=fI.arrayGridGen(N,rng)
+    step=cI.updater(N,J,T,0,lattice,rng,algorithm)
+    acc=MomentAccumulator(blocks,sweeps//blocks)
+    k=0
+    while k<burnIn+sweeps:
+        step()
+        if k>=burnIn:
+            acc.add(fI.arrayHamiltonian(J,lattice),fI.arrayMagnetisation(lattice))
+        k+=1
+    value,error=jackknife(acc,N*N,T)
+    row={"N":N, "T":T, "samples":acc.samples}
+    for name,v,e in zip(["e","absM","C","chi","U"],value,error):
+        row[name]=float(v)
+        row[name+"_err"]=float(e)
+    return row
+
+def finiteSizeScaling(Ns:list[int], temps:list[float], J:float=1, sweeps:int=2000, burnIn:int | None =None, algorithm:str="metropolis", blocks:int=20, workers:int | None =None, seed:int | None =None, output:str | None ="fss_results.csv", progress:bool=True)->list[dict]:
+    """
+    Run every (N, T) pair of the grid with the given algorithm ("metropolis" checkerboard sweeps, "wolff" or "swendsenwang"),
+    measuring for sweeps iterations after burnIn (sweeps//5 by default). Each point gets its own random stream spawned from
+    seed in grid order, so results do not depend on the schedule.
+
+    Return one dict per point, sorted by N then T, holding the per-site energy e, |m|, specific heat C, susceptibility chi
+    (from <M^2>-<|M|>^2) and Binder cumulant U=1-<M^4>/(3<M^2>^2), each with a jackknife error (key+"_err").
+    The same rows are written to output as CSV unless output is None.
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    if burnIn is None:
+        burnIn=sweeps//5
+    grid=[(N,T) for N in Ns for T in temps]
+    streams=np.random.SeedSequence(seed).spawn(len(grid))
+    jobs=[(N,J,T,sweeps,burnIn,algorithm,blocks,streams[k]) for k,(N,T) in enumerate(grid)]
+    jobs.sort(key=lambda job: -job[0])
+    rows=[]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures=[pool.submit(pointWorker,job) for job in jobs]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            if progress:
+                print("Finished", len(rows), "of", len(jobs), "points (N=", rows[-1]["N"], ", T=", rows[-1]["T"], ")")
+    rows.sort(key=lambda row: (row["N"],row["T"]))
+    if output is not None:
+        with open(output,"w",newline="") as f:
+            writer=csv.DictWriter(f,fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
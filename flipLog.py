@@ -0,0 +1,303 @@
+"""
+Compact record of a run's trajectory: the starting lattice, the site of every accepted flip and periodic keyframe snapshots,
+from which any iteration can be rebuilt afterwards (FlipReplay) to render video or recompute observables. A log is a
+directory holding
+
+    flips.bin       append-only raw int32 array of flat site indices i*N+j, one per accepted flip
+    gaps.bin        append-only raw int32 array of the iterations since the previous flip (0 for flips in the same sweep)
+    keyframes.bin   append-only raw int8 N x N lattices, the first one being the starting lattice
+    log.json        N, J, H, keyframeEvery, the keyframe index ([iteration, flips so far, iteration of the last flip])
+                    and the last iteration
+
+so the trajectory costs 8 bytes per accepted flip plus N^2 bytes per keyframe, instead of a full frame per snapshot.
+The state "at iteration t" is the lattice after every flip of iterations <= t; the starting lattice sits at iteration -1
+for a fresh run.
+"""
+import json
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import fastIsing as fI
+import twoDIsing as tDI
+
+class FlipLog:
+    def __init__(self, path:str, N:int, J:float, H:float=0, keyframeEvery:int=10000, chunkSize:int=65536):
+        self.path=path
+        self.N=N
+        self.J=J
+        self.H=H
+        self.keyframeEvery=max(1,keyframeEvery)
+        self.chunkSize=max(1,chunkSize)
+        os.makedirs(path,exist_ok=True)
+        for name in ["flips.bin","gaps.bin","keyframes.bin"]:
+            open(os.path.join(path,name),"wb").close()
+        self.sites=[]
+        self.times=[]
+        self.count=0
+        self.lastTime=None
+        self.keyframes=[]
+        self.lastIteration=None
+        self.previous=None
+        self.bytesWritten=0
+
+    def begin(self, lattice, iteration:int=-1):
+        """
+        Start the log from lattice as the state at iteration (-1 before the first attempt; a resumed run passes the
+        iteration it resumes after)
+        """
+        self.lastTime=iteration
+        self.keyframe(iteration,lattice)
+
+    def flip(self, iteration:int, site:int):
+        """
+        Record one accepted flip of the flat site index site at iteration
+        """
+        self.sites.append(site)
+        self.times.append(iteration)
+        if len(self.sites)>=self.chunkSize:
+            self.flush()
+
+    def flips(self, iteration:int, sites:np.ndarray):
+        """
+        Record several accepted flips at the same iteration (a sweep or cluster step)
+        """
+        self.sites.extend(sites.tolist())
+        self.times.extend([iteration]*len(sites))
+        if len(self.sites)>=self.chunkSize:
+            self.flush()
+
+    def record(self, iteration:int, lattice:np.ndarray):
+        """
+        Record an array engine step: log every site that differs from the lattice at the previous call (each site changes
+        at most once per sweep or cluster step, so the difference is exactly the flips) and add a keyframe on the cadence
+        """
+        flat=np.asarray(lattice,dtype=np.int8).reshape(-1)
+        self.flips(iteration,np.flatnonzero(flat!=self.previous))
+        self.previous[:]=flat
+        if iteration%self.keyframeEvery==0:
+            self.keyframe(iteration,lattice)
+
+    def flush(self):
+        """
+        Append the buffered flips to flips.bin and gaps.bin
+        """
+        if not self.sites:
+            return
+        times=np.array(self.times,dtype=np.int64)
+        gaps=np.diff(times,prepend=self.lastTime).astype(np.int32)
+        sites=np.array(self.sites,dtype=np.int32)
+        with open(os.path.join(self.path,"flips.bin"),"ab") as f:
+            sites.tofile(f)
+        with open(os.path.join(self.path,"gaps.bin"),"ab") as f:
+            gaps.tofile(f)
+        self.bytesWritten+=sites.nbytes+gaps.nbytes
+        self.count+=sites.size
+        self.lastTime=int(times[-1])
+        self.sites=[]
+        self.times=[]
+
+    def keyframe(self, iteration:int, lattice):
+        """
+        Flush the flips and save lattice as the state at iteration
+        """
+        self.flush()
+        snapshot=np.asarray(lattice,dtype=np.int8)
+        with open(os.path.join(self.path,"keyframes.bin"),"ab") as f:
+            snapshot.tofile(f)
+        self.bytesWritten+=snapshot.nbytes
+        self.previous=snapshot.reshape(-1).copy()
+        self.keyframes.append([iteration,self.count,self.lastTime])
+        self.lastIteration=iteration
+        self.save()
+
+    def close(self, iteration:int, lattice):
+        """
+        Finish the log at iteration, adding a final keyframe of lattice unless one was just taken
+        """
+        if self.keyframes[-1][0]!=iteration:
+            self.keyframe(iteration,lattice)
+
+    def save(self):
+        """
+        Write log.json, replacing it atomically
+        """
+        file=os.path.join(self.path,"log.json")
+        with open(file+".tmp","w") as f:
+            json.dump({"N":self.N, "J":self.J, "H":self.H, "keyframeEvery":self.keyframeEvery, "flips":self.count,
+                       "keyframes":self.keyframes, "lastIteration":self.lastIteration},f)
+        os.replace(file+".tmp",file)
+
+class FlipReplay:
+    """
+    Read-only view of a FlipLog directory. latticeAt rebuilds any iteration by seeking to the last keyframe at or before it
+    and applying the flips since; lattices, observables and renderVideo walk through many iterations, split into keyframe
+    segments that are processed in parallel worker processes.
+    """
+    def __init__(self, path:str):
+        self.path=path
+        with open(os.path.join(path,"log.json")) as f:
+            meta=json.load(f)
+        self.N=meta["N"]
+        self.J=meta["J"]
+        self.H=meta["H"]
+        self.keyframeEvery=meta["keyframeEvery"]
+        self.keyframes=np.array(meta["keyframes"],dtype=np.int64)
+        self.firstIteration=int(self.keyframes[0,0])
+        self.lastIteration=meta["lastIteration"]
+        count=meta["flips"]
+        self.sites=np.memmap(os.path.join(path,"flips.bin"),dtype=np.int32,mode="r",shape=(count,)) if count else np.empty(0,dtype=np.int32)
+        self.gaps=np.memmap(os.path.join(path,"gaps.bin"),dtype=np.int32,mode="r",shape=(count,)) if count else np.empty(0,dtype=np.int32)
+        self.snapshots=np.memmap(os.path.join(path,"keyframes.bin"),dtype=np.int8,mode="r",shape=(len(self.keyframes),self.N,self.N))
+
+    def keyframeBefore(self, iteration:int)->int:
+        """
+        Return the index of the last keyframe at or before iteration
+        """
+        if not self.firstIteration<=iteration<=self.lastIteration:
+            raise ValueError("Iteration "+str(iteration)+" is outside the log ("+str(self.firstIteration)+" to "+str(self.lastIteration)+")")
+        return int(np.searchsorted(self.keyframes[:,0],iteration,side="right"))-1
+
+    def segment(self, k:int)->tuple[np.ndarray,np.ndarray]:
+        """
+        Return (sites, iterations) of the flips between keyframe k and the next one
+        """
+        start=self.keyframes[k,1]
+        stop=self.keyframes[k+1,1] if k+1<len(self.keyframes) else self.sites.size
+        return np.asarray(self.sites[start:stop]), self.keyframes[k,2]+np.cumsum(self.gaps[start:stop],dtype=np.int64)
+
+    def latticeAt(self, iteration:int)->np.ndarray:
+        """
+        Return the N x N int8 lattice at iteration
+        """
+        return next(self.segmentLattices(self.keyframeBefore(iteration),[iteration]))
+
+    def segmentLattices(self, k:int, iterations:list[int]):
+        """
+        Yield the lattice at each of the sorted iterations, which must lie between keyframe k and the next one. The same
+        array is updated in place and yielded every time, so copy it to keep it.
+        """
+        lattice=np.array(self.snapshots[k])
+        flat=lattice.reshape(-1)
+        sites,times=self.segment(k)
+        ends=np.searchsorted(times,iterations,side="right")
+        done=0
+        for end in ends:
+            np.multiply.at(flat,sites[done:end],np.int8(-1))
+            done=end
+            yield lattice
+
+    def segmentObservables(self, k:int, iterations:list[int])->tuple[list[float],list[int]]:
+        """
+        Return the energy (including -H*M) and magnetisation at each of the sorted iterations between keyframe k and the
+        next one, stepping through the flips with the same incremental dE=2*s*(J*f+H) as the single spin solver
+        """
+        N=self.N
+        J=self.J
+        H=self.H
+        start=np.array(self.snapshots[k])
+        mag=fI.arrayMagnetisation(start)
+        energy=fI.arrayHamiltonian(J,start,H)
+        lattice=start.reshape(-1).tolist()
+        index=np.arange(N*N).reshape(N,N)
+        up,down,left,right=[np.roll(index,shift,axis=axis).reshape(-1).tolist() for shift,axis in [(1,0),(-1,0),(1,1),(-1,1)]]
+        sites,times=self.segment(k)
+        sites=sites.tolist()
+        ends=np.searchsorted(times,iterations,side="right").tolist()
+        energies=[]
+        magnetisations=[]
+        done=0
+        for end in ends:
+            while done<end:
+                s=sites[done]
+                spin=lattice[s]
+                energy+=2*spin*(J*(lattice[up[s]]+lattice[down[s]]+lattice[left[s]]+lattice[right[s]])+H)
+                mag-=2*spin
+                lattice[s]=-spin
+                done+=1
+            energies.append(energy)
+            magnetisations.append(mag)
+        return energies, magnetisations
+
+    def split(self, iterations:list[int])->list[tuple[int,list[int]]]:
+        """
+        Group sorted iterations into (keyframe index, iterations) segments
+        """
+        iterations=list(iterations)
+        if not iterations:
+            return []
+        self.keyframeBefore(iterations[0])
+        self.keyframeBefore(iterations[-1])
+        ks=np.searchsorted(self.keyframes[:,0],iterations,side="right")-1
+        bounds=np.flatnonzero(np.diff(ks))+1
+        return [(int(ks[a]),iterations[a:b]) for a,b in zip([0]+bounds.tolist(),bounds.tolist()+[len(iterations)])]
+
+    def iterationRange(self, start:int | None, stop:int | None, every:int)->list[int]:
+        start=max(0,self.firstIteration) if start is None else start
+        stop=self.lastIteration if stop is None else stop
+        return list(range(start,stop+1,max(1,every)))
+
+    def lattices(self, iterations:list[int]):
+        """
+        Yield a copy of the lattice at each of the sorted iterations, in order
+        """
+        for k,part in self.split(iterations):
+            for lattice in self.segmentLattices(k,part):
+                yield lattice.copy()
+
+    def observables(self, iterations:list[int] | None =None, every:int=1, workers:int | None =None)->tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """
+        Recompute (iterations, energies, magnetisations) at the sorted iterations (default every every-th iteration of
+        the log), one keyframe segment per worker process. They match the running totals of the original run.
+        """
+        if iterations is None:
+            iterations=self.iterationRange(None,None,every)
+        energies=[]
+        magnetisations=[]
+        for segEnergies,segMags in orderedMap(observablesWorker,[(self.path,k,part) for k,part in self.split(iterations)],workers):
+            energies.extend(segEnergies)
+            magnetisations.extend(segMags)
+        return np.array(iterations,dtype=np.int64), np.array(energies), np.array(magnetisations,dtype=np.int64)
+
+    def renderVideo(self, path:str, fps:int=100, frameEvery:int=1, scale:int | None =None, start:int | None =None, stop:int | None =None, workers:int | None =None)->int:
+        """
+        Write a video with one frame every frameEvery iterations between start and stop (default the whole log). Frames
+        are drawn in parallel, one keyframe segment per worker process, and encoded in order here. Return the frame count.
+        """
+        import imageio
+        frames=0
+        jobs=[(self.path,k,part,scale) for k,part in self.split(self.iterationRange(start,stop,frameEvery))]
+        with imageio.get_writer(path,fps=fps) as writer:
+            for segment in orderedMap(framesWorker,jobs,workers):
+                for frame in segment:
+                    writer.append_data(frame)
+                    frames+=1
+        return frames
+
+def observablesWorker(args)->tuple[list[float],list[int]]:
+    path,k,iterations=args
+    return FlipReplay(path).segmentObservables(k,iterations)
+
+def framesWorker(args)->list[np.ndarray]:
+    path,k,iterations,scale=args
+    return [tDI.lattice_to_rgb(lattice,scale) for lattice in FlipReplay(path).segmentLattices(k,iterations)]
+
+def orderedMap(fn, jobs:list, workers:int | None =None):
+    """
+    Yield fn(job) for every job in order, running them in a process pool with at most two jobs per worker in flight so
+    finished results do not pile up in memory. workers=1 runs them here.
+    """
+    if workers is None:
+        workers=os.cpu_count() or 1
+    if workers==1 or len(jobs)<2:
+        for job in jobs:
+            yield fn(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending=[pool.submit(fn,job) for job in jobs[:2*workers]]
+        submitted=len(pending)
+        while pending:
+            result=pending.pop(0).result()
+            if submitted<len(jobs):
+                pending.append(pool.submit(fn,jobs[submitted]))
+                submitted+=1
+            yield result
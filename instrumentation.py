@@ -0,0 +1,90 @@
+"""
+Opt-in instrumentation for solver runs. Pass a Metrics object to a solver (metrics=Metrics()) to record how long each phase
+takes and how often things happen; solvers skip all of it when metrics is None, so a normal run pays a single None check
+per iteration. Per-phase times are wall seconds from time.perf_counter.
+"""
+import time
+from contextlib import contextmanager
+
+class Metrics:
+    """
+    Collects
+        timers       seconds spent per phase ("kernel", "checks", "rendering", "monitor", "checkpoint", "plotting", ...)
+        counters     event counts ("attempts", "accepts", "frames", "bytesWritten", ...)
+        acceptance   [attempts, accepts] per energy change dE of a single spin flip
+
+    progressInterval (in seconds) makes tick print a one-line status at most that often, instead of the solvers'
+    per-iteration progress block.
+    """
+    def __init__(self, progressInterval:float | None =None):
+        self.timers={}
+        self.counters={}
+        self.acceptance={}
+        self.progressInterval=progressInterval
+        self.start=time.perf_counter()
+        self.lastProgress=self.start
+
+    def add(self, phase:str, seconds:float):
+        self.timers[phase]=self.timers.get(phase,0.0)+seconds
+
+    def count(self, name:str, n:int=1):
+        self.counters[name]=self.counters.get(name,0)+n
+
+    @contextmanager
+    def phase(self, name:str):
+        """
+        Time a block of code as phase name: with metrics.phase("plotting"): ...
+        """
+        start=time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name,time.perf_counter()-start)
+
+    def attempt(self, dE:float, accepted:bool):
+        """
+        Record one single spin flip attempt with energy change dE
+        """
+        entry=self.acceptance.get(dE)
+        if entry is None:
+            entry=self.acceptance[dE]=[0,0]
+        entry[0]+=1
+        entry[1]+=accepted
+        self.counters["attempts"]=self.counters.get("attempts",0)+1
+        self.counters["accepts"]=self.counters.get("accepts",0)+accepted
+
+    def tick(self, iters:int, energy:float, mag:float):
+        """
+        Print a progress line if progressInterval seconds have passed since the last one
+        """
+        if self.progressInterval is None:
+            return
+        now=time.perf_counter()
+        if now-self.lastProgress>=self.progressInterval:
+            self.lastProgress=now
+            print(f"[{now-self.start:8.1f}s] iteration {iters} || Energy={energy} || Magnetisation={mag}", flush=True)
+
+    def summary(self)->dict:
+        """
+        Return everything recorded as a plain dict, adding the wall time, the overall acceptance ratio and the acceptance
+        ratio per dE class
+        """
+        attempts=self.counters.get("attempts",0)
+        return {"wallTime":time.perf_counter()-self.start, "timers":dict(self.timers), "counters":dict(self.counters),
+                "acceptanceRatio":self.counters.get("accepts",0)/attempts if attempts else None,
+                "acceptanceByDE":{dE:{"attempts":a, "accepts":k, "ratio":k/a} for dE,(a,k) in sorted(self.acceptance.items())}}
+
+    def report(self):
+        """
+        Print the summary as a short table, phases sorted by time
+        """
+        summary=self.summary()
+        print("Wall time: ", round(summary["wallTime"],3), "s")
+        for phase,seconds in sorted(summary["timers"].items(),key=lambda item: -item[1]):
+            print(f"  {phase:<12} {seconds:10.3f} s  ({100*seconds/max(summary['wallTime'],1e-12):5.1f}%)")
+        for name,value in summary["counters"].items():
+            print(f"  {name:<12} {value}")
+        if summary["acceptanceRatio"] is not None:
+            print("  acceptance   ", round(summary["acceptanceRatio"],4))
+        for dE,entry in summary["acceptanceByDE"].items():
+            print(f"  dE={dE:<8} {entry['accepts']}/{entry['attempts']} = {entry['ratio']:.4f}")
@@ -0,0 +1,268 @@
+"""
+Non-interactive command line front end for batch jobs. Every subcommand runs one of the headless solver functions
+and writes its results as JSON (to stdout or to --output), with no prompts, plots or videos.
+
+Example: python isingCLI.py metropolis --N 64 --T 2.2 --engine wolff --maxIters 2000 --seed 1
+"""
+import argparse
+import json
+import sys
+
+def runMetropolis(args)->dict:
+    metrics=None
+    if args.profile:
+        import instrumentation as ins
+        metrics=ins.Metrics()
+    flipLog=None
+    if args.flipLog is not None:
+        import flipLog as fL
+        flipLog=fL.FlipLog(args.flipLog,args.N,args.J,args.H,args.keyframeEvery)
+    monitor=None
+    if args.targetError is not None:
+        import equilibration as eq
+        monitor=eq.EquilibrationMonitor(args.N*args.N,args.targetError)
+    if args.engine=="single":
+        import twoDIsing as tDI
+        store=None
+        if args.store is not None:
+            import runStore as rS
+            store=rS.RunStore(args.store,args.N,args.checkpointEvery)
+        result=tDI.metropolisRun(args.N,args.J,args.T,args.H,args.maxIters,None,args.seed,monitor=monitor,store=store,metrics=metrics,flipLog=flipLog)
+        results={"energy":result["energy"], "magnetisation":result["magnetisation"],
+                 "iterations":len(result["iterations"]), "converged":result["converged"]}
+    else:
+        import clusterIsing as cI
+        algorithm="metropolis" if args.engine=="checkerboard" else args.engine
+        lattice,energies,mags=cI.simulate(args.N,args.J,args.T,args.H,args.maxIters,None,args.seed,algorithm,monitor,metrics,flipLog)
+        results={"energy":energies[-1], "magnetisation":mags[-1], "iterations":len(energies),
+                 "energies":energies, "magnetisations":mags}
+    if monitor is not None:
+        results["equilibration"]=monitor.summary()
+    if metrics is not None:
+        results["metrics"]=metrics.summary()
+    return results
+
+def runReplay(args)->dict:
+    import flipLog as fL
+    replay=fL.FlipReplay(args.log)
+    results={"N":replay.N, "flips":int(replay.sites.size), "keyframes":len(replay.keyframes), "lastIteration":replay.lastIteration}
+    if args.video is not None:
+        results["frames"]=replay.renderVideo(args.video,args.fps,args.frameEvery,None,args.start,args.stop,args.workers)
+    if args.every:
+        iterations,energies,mags=replay.observables(replay.iterationRange(args.start,args.stop,args.every),workers=args.workers)
+        results.update({"iterations":iterations.tolist(), "energies":energies.tolist(), "magnetisations":mags.tolist()})
+    return results
+
+def runSweep(args)->dict:
+    import tempMagnetisation as tM
+    if args.algorithm=="batch":
+        temps,mags,errors=tM.batchMagnetisationTemperature(args.N,args.J,args.Tmin,args.Tmax,args.dT,args.replicas,args.clusterIters,
+                                                           seed=args.seed,show=False)
+        return {"temperatures":temps, "magnetisations":mags, "errors":errors}
+    temps,mags,errors=tM.parallelMagnetisationTemperature(args.N,args.J,args.Tmin,args.Tmax,args.dT,args.replicas,args.workers,
+                                                           args.seed,args.algorithm,args.clusterIters,progress=False,show=False,
+                                                           targetError=args.targetError)
+    return {"temperatures":temps, "magnetisations":mags, "errors":errors}
+
+def runTempering(args)->dict:
+    import parallelTempering as pT
+    temps,mags,energies,swapRates=pT.parallelTempering(args.N,args.J,pT.temperatureLadder(args.Tmin,args.Tmax,args.M),args.H,
+                                                         args.sweeps,args.swapEvery,None,args.seed,args.workers,show=False)
+    return {"temperatures":temps, "magnetisations":mags, "energies":energies, "swapRates":swapRates}
+
+def runFiniteSize(args)->dict:
+    import numpy as np
+    import finiteSize as fS
+    temps=np.arange(args.Tmin,args.Tmax+args.dT/2,args.dT).tolist()
+    rows=fS.finiteSizeScaling(args.Ns,temps,args.J,args.sweeps,args.burnIn,args.algorithm,args.blocks,args.workers,args.seed,
+                              args.csv,progress=False)
+    return {"points":rows}
+
+def runReweight(args)->dict:
+    import reweighting as rw
+    return rw.reweightedMagnetisationTemperature(args.N,args.J,args.Tmin,args.Tmax,args.dT,args.simTemps,args.H,args.sweeps,
+                                                 args.algorithm,args.workers,args.seed,show=False)
+
+def runWangLandau(args)->dict:
+    import numpy as np
+    import wangLandau as wl
+    dos=wl.wangLandau(args.N,args.windows,args.overlap,args.joint,args.lnfFinal,args.flatness,args.checkSweeps,args.workers,args.seed)
+    temps=np.arange(args.Tmin,args.Tmax+args.dT/2,args.dT).tolist()
+    results=wl.thermodynamics(dos,args.J,temps,args.H)
+    results["lnG"]=np.where(np.isfinite(dos["lnG"]),dos["lnG"],None).tolist()
+    results["bonds"]=dos["bonds"].tolist()
+    return results
+
+def runGeometry(args)->dict:
+    import numpy as np
+    import latticeGeometry as lG
+    lattice=lG.GEOMETRIES[args.geometry](args.L,not args.open)
+    if args.bonds!="uniform":
+        lG.randomBonds(lattice,np.random.default_rng(args.seed),args.bonds,args.p)
+    spins,energies,mags=lG.latticeMetropolis(lattice,args.J,args.T,args.H,args.maxIters,None,args.seed)
+    return {"sites":lattice.sites, "colours":len(lattice.colours), "energy":energies[-1], "magnetisation":mags[-1],
+            "energies":energies, "magnetisations":mags}
+
+def runChain(args)->dict:
+    import oneDIsing as oDI
+    sol=oDI.hamiltonian(args.N,args.J,args.h,verbosity=False,backend=args.backend,k=1,periodic=args.periodic)
+    return {"groundStateEnergy":float(sol["Energy Eigenvalues"][0]),
+            "spins (x,z)":oDI.spin(args.N,args.J,args.h,verbosity=False,backend=args.backend,periodic=args.periodic)}
+
+def runChainSweep(args)->dict:
+    import oneDIsing as oDI
+    x,energies=oDI.groundStateSweep(args.N,args.J,args.h,1 if args.vary=="h" else 0,args.max,args.step,args.periodic,args.backend,args.workers)
+    return {args.vary:x, "groundStateEnergies":energies[:,0].tolist()}
+
+def buildParser()->argparse.ArgumentParser:
+    parser=argparse.ArgumentParser(description="Batch runner for the Ising model solvers")
+    parser.add_argument("--output",help="Write the JSON results to this file instead of stdout")
+    sub=parser.add_subparsers(dest="command",required=True)
+
+    p=sub.add_parser("metropolis",help="Single 2D run")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--T",type=float,required=True)
+    p.add_argument("--H",type=float,default=0.0)
+    p.add_argument("--maxIters",type=int,default=1000,help="Spin attempts for the single engine, sweeps or cluster steps otherwise")
+    p.add_argument("--engine",choices=["single","checkerboard","wolff","swendsenwang"],default="checkerboard")
+    p.add_argument("--seed",type=int)
+    p.add_argument("--targetError",type=float,help="Stop once equilibrated and the error per site of E and |M| is below this")
+    p.add_argument("--store",help="Run store directory for the single engine: checkpoint there and resume from it if it exists")
+    p.add_argument("--checkpointEvery",type=int,default=100000)
+    p.add_argument("--profile",action="store_true",help="Include per-phase timers, counters and acceptance per dE class")
+    p.add_argument("--flipLog",help="Directory to log the starting lattice, every accepted flip and keyframes to (see replay)")
+    p.add_argument("--keyframeEvery",type=int,default=10000,help="Iterations between flip log keyframes")
+    p.set_defaults(func=runMetropolis)
+
+    p=sub.add_parser("replay",help="Render a video or recompute the observables from a flip log")
+    p.add_argument("--log",required=True,help="Flip log directory written by metropolis --flipLog")
+    p.add_argument("--video",help="Write a video of the run to this file")
+    p.add_argument("--fps",type=int,default=100)
+    p.add_argument("--frameEvery",type=int,default=1,help="Iterations between video frames")
+    p.add_argument("--every",type=int,default=0,help="Recompute the energy and magnetisation every so many iterations")
+    p.add_argument("--start",type=int,help="First iteration (default the start of the log)")
+    p.add_argument("--stop",type=int,help="Last iteration (default the end of the log)")
+    p.add_argument("--workers",type=int)
+    p.set_defaults(func=runReplay)
+
+    p=sub.add_parser("sweep",help="Parallel magnetisation vs temperature sweep")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--Tmin",type=float,required=True)
+    p.add_argument("--Tmax",type=float,required=True)
+    p.add_argument("--dT",type=float,required=True)
+    p.add_argument("--replicas",type=int,default=1)
+    p.add_argument("--workers",type=int)
+    p.add_argument("--algorithm",choices=["metropolis","wolff","swendsenwang","batch"],default="metropolis",
+                   help="batch runs every temperature and replica as one fastIsing.batchMetropolis array in a single process")
+    p.add_argument("--clusterIters",type=int,default=1000,help="Iterations per run for the cluster and batch algorithms")
+    p.add_argument("--seed",type=int)
+    p.add_argument("--targetError",type=float,help="Use equilibration detection with this error per site in every run")
+    p.set_defaults(func=runSweep)
+
+    p=sub.add_parser("tempering",help="Parallel tempering over a geometric temperature ladder")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--H",type=float,default=0.0)
+    p.add_argument("--Tmin",type=float,required=True)
+    p.add_argument("--Tmax",type=float,required=True)
+    p.add_argument("--M",type=int,default=16,help="Number of replicas")
+    p.add_argument("--sweeps",type=int,default=2000)
+    p.add_argument("--swapEvery",type=int,default=10)
+    p.add_argument("--workers",action="store_true",help="Run every replica in its own process")
+    p.add_argument("--seed",type=int)
+    p.set_defaults(func=runTempering)
+
+    p=sub.add_parser("fss",help="Finite size scaling grid: specific heat, susceptibility and Binder cumulant over (N, T)")
+    p.add_argument("--Ns",type=int,nargs="+",required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--Tmin",type=float,required=True)
+    p.add_argument("--Tmax",type=float,required=True)
+    p.add_argument("--dT",type=float,required=True)
+    p.add_argument("--sweeps",type=int,default=2000)
+    p.add_argument("--burnIn",type=int)
+    p.add_argument("--algorithm",choices=["metropolis","wolff","swendsenwang"],default="metropolis")
+    p.add_argument("--blocks",type=int,default=20,help="Jackknife blocks per run")
+    p.add_argument("--workers",type=int)
+    p.add_argument("--seed",type=int)
+    p.add_argument("--csv",default="fss_results.csv",help="Tidy results file")
+    p.set_defaults(func=runFiniteSize)
+
+    p=sub.add_parser("reweight",help="Dense temperature curve from a few simulations by multiple histogram reweighting")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--H",type=float,default=0.0)
+    p.add_argument("--Tmin",type=float,required=True)
+    p.add_argument("--Tmax",type=float,required=True)
+    p.add_argument("--dT",type=float,required=True)
+    p.add_argument("--simTemps",type=float,nargs="+",required=True,help="Temperatures that are actually simulated")
+    p.add_argument("--sweeps",type=int,default=5000)
+    p.add_argument("--algorithm",choices=["metropolis","wolff","swendsenwang"],default="metropolis")
+    p.add_argument("--workers",type=int)
+    p.add_argument("--seed",type=int)
+    p.set_defaults(func=runReweight)
+
+    p=sub.add_parser("wanglandau",help="Density of states from one Wang-Landau run, then E, C, F, S at every temperature")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--H",type=float,default=0.0,help="Field for the thermodynamics (needs --joint)")
+    p.add_argument("--Tmin",type=float,required=True)
+    p.add_argument("--Tmax",type=float,required=True)
+    p.add_argument("--dT",type=float,required=True)
+    p.add_argument("--joint",action="store_true",help="Sample g(E, M) and also report <|M|> and the susceptibility")
+    p.add_argument("--windows",type=int,default=1,help="Energy windows, each run by its own worker")
+    p.add_argument("--overlap",type=float,default=0.25,help="Overlap of neighbouring windows as a fraction of their width")
+    p.add_argument("--lnfFinal",type=float,default=1e-6)
+    p.add_argument("--flatness",type=float,default=0.8)
+    p.add_argument("--checkSweeps",type=int,default=100,help="Sweeps between flatness checks")
+    p.add_argument("--workers",type=int)
+    p.add_argument("--seed",type=int)
+    p.set_defaults(func=runWangLandau)
+
+    p=sub.add_parser("geometry",help="Metropolis run on a square, cubic, triangular or honeycomb lattice, optionally with random bonds")
+    p.add_argument("--geometry",choices=["square","cubic","triangular","honeycomb"],default="square")
+    p.add_argument("--L",type=int,required=True,help="Linear size")
+    p.add_argument("--open",action="store_true",help="Open instead of periodic boundaries")
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--T",type=float,required=True)
+    p.add_argument("--H",type=float,default=0.0)
+    p.add_argument("--bonds",choices=["uniform","bimodal","gaussian"],default="uniform")
+    p.add_argument("--p",type=float,default=0.5,help="Fraction of antiferromagnetic bonds for --bonds bimodal")
+    p.add_argument("--maxIters",type=int,default=1000,help="Sweeps")
+    p.add_argument("--seed",type=int)
+    p.set_defaults(func=runGeometry)
+
+    p=sub.add_parser("chain",help="1D quantum Ising chain by exact diagonalisation")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0)
+    p.add_argument("--h",type=float,required=True)
+    p.add_argument("--backend",choices=["dense","sparse","matrixfree","symmetry"],default="dense")
+    p.add_argument("--periodic",action="store_true",help="Close the chain into a ring")
+    p.set_defaults(func=runChain)
+
+    p=sub.add_parser("chainsweep",help="Ground state energy of the 1D chain swept over J or h")
+    p.add_argument("--N",type=int,required=True)
+    p.add_argument("--J",type=float,default=1.0,help="Start value of J (or its fixed value)")
+    p.add_argument("--h",type=float,default=0.0,help="Start value of h (or its fixed value)")
+    p.add_argument("--vary",choices=["J","h"],default="h")
+    p.add_argument("--max",type=float,required=True)
+    p.add_argument("--step",type=float,required=True)
+    p.add_argument("--backend",choices=["sparse","matrixfree"],default="sparse")
+    p.add_argument("--periodic",action="store_true")
+    p.add_argument("--workers",type=int)
+    p.set_defaults(func=runChainSweep)
+    return parser
+
+def main(argv:list[str] | None =None):
+    args=buildParser().parse_args(argv)
+    results=args.func(args)
+    if args.output:
+        with open(args.output,"w") as f:
+            json.dump(results,f,indent=1)
+    else:
+        json.dump(results,sys.stdout,indent=1)
+        print()
+
+if __name__=="__main__":
+    main()
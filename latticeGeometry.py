@@ -0,0 +1,196 @@
+"""
+General lattice geometries for the classical Ising model. A Lattice holds a fixed-degree int32 neighbour table, so the
+energy, magnetisation and Metropolis kernels never do modulo arithmetic or assume a square grid, and optional per-bond
+couplings J_ij (e.g. random bonds for spin glasses).
+
+Spins are stored as a flat int8 array of length sites+1. The last entry is a ghost site that always holds spin 0: with open
+boundaries, missing neighbours point at it, so every site still has exactly z table entries and the kernels stay vectorised.
+Sites are split into conflict-free colour classes by a greedy graph colouring, and each class is updated in one step.
+"""
+import numpy as np
+
+class Lattice:
+    """
+    A lattice of sites with neighbour table neighbours ((sites, z) int32, ghost index = sites), optional couplings
+    ((sites, z) float, J_ij relative to J, zero towards the ghost) and colours (list of site index arrays).
+    shape is the grid the flat site index unrolls from, used to reshape spins for plotting.
+    """
+    def __init__(self, name:str, shape:tuple[int,...], neighbours:np.ndarray, periodic:bool):
+        self.name=name
+        self.shape=shape
+        self.sites=neighbours.shape[0]
+        self.neighbours=neighbours.astype(np.int32)
+        self.periodic=periodic
+        self.couplings=None
+        self.colours=greedyColouring(self.neighbours)
+
+    @property
+    def degree(self)->int:
+        return self.neighbours.shape[1]
+
+def offsetNeighbours(shape:tuple[int,...], offsets:list[tuple[int,...]], periodic:bool)->np.ndarray:
+    """
+    Build the neighbour table of a hypercubic grid of the given shape where every site links to site+offset for each
+    offset. Without periodic boundaries, links leaving the grid point at the ghost site.
+    """
+    sites=int(np.prod(shape))
+    coords=np.indices(shape).reshape(len(shape),-1)
+    table=np.empty((sites,len(offsets)),dtype=np.int64)
+    for k,offset in enumerate(offsets):
+        moved=coords+np.array(offset)[:,None]
+        if periodic:
+            moved%=np.array(shape)[:,None]
+            table[:,k]=np.ravel_multi_index(moved,shape)
+        else:
+            inside=np.all((moved>=0)&(moved<np.array(shape)[:,None]),axis=0)
+            table[:,k]=sites
+            table[inside,k]=np.ravel_multi_index(moved[:,inside],shape)
+    return table
+
+def squareLattice(L:int, periodic:bool=True)->Lattice:
+    """
+    L x L square lattice (4 neighbours), the geometry of twoDIsing and fastIsing
+    """
+    return Lattice("square",(L,L),offsetNeighbours((L,L),[(1,0),(-1,0),(0,1),(0,-1)],periodic),periodic)
+
+def cubicLattice(L:int, periodic:bool=True)->Lattice:
+    """
+    L x L x L simple cubic lattice (6 neighbours)
+    """
+    offsets=[(1,0,0),(-1,0,0),(0,1,0),(0,-1,0),(0,0,1),(0,0,-1)]
+    return Lattice("cubic",(L,L,L),offsetNeighbours((L,L,L),offsets,periodic),periodic)
+
+def triangularLattice(L:int, periodic:bool=True)->Lattice:
+    """
+    L x L triangular lattice (6 neighbours), stored as a square grid with one extra diagonal
+    """
+    offsets=[(1,0),(-1,0),(0,1),(0,-1),(1,-1),(-1,1)]
+    return Lattice("triangular",(L,L),offsetNeighbours((L,L),offsets,periodic),periodic)
+
+def honeycombLattice(L:int, periodic:bool=True)->Lattice:
+    """
+    Honeycomb lattice (3 neighbours) of L x L sites in the brick wall representation: every site links left and right,
+    and up or down depending on the parity of i+j. Periodic boundaries need an even L.
+    """
+    if periodic and L%2:
+        raise ValueError("A periodic honeycomb lattice needs an even L, got L="+str(L))
+    table=offsetNeighbours((L,L),[(0,1),(0,-1),(1,0),(-1,0)],periodic)
+    ii,jj=np.indices((L,L))
+    up=((ii+jj)%2==0).ravel()
+    vertical=np.where(up,table[:,2],table[:,3])
+    return Lattice("honeycomb",(L,L),np.stack([table[:,0],table[:,1],vertical],axis=1),periodic)
+
+def greedyColouring(neighbours:np.ndarray)->list[np.ndarray]:
+    """
+    Colour the sites so that no two neighbours share a colour, giving every site the smallest colour not used by an
+    already coloured neighbour. Return one array of site indices per colour.
+    """
+    sites,z=neighbours.shape
+    colour=np.full(sites+1,-1,dtype=np.int64)
+    rows=neighbours.tolist()
+    for i in range(sites):
+        used={colour[j] for j in rows[i]}
+        c=0
+        while c in used:
+            c+=1
+        colour[i]=c
+    colour=colour[:sites]
+    return [np.flatnonzero(colour==c) for c in range(colour.max()+1)]
+
+def randomBonds(lattice:Lattice, rng:np.random.Generator | None =None, distribution:str="bimodal", p:float=0.5)->Lattice:
+    """
+    Give every bond of lattice its own coupling J_ij (in place, also returned): "bimodal" draws +1 or -1 (-1 with
+    probability p, the +/-J spin glass), "gaussian" draws from a standard normal distribution. Both directions of a bond
+    share the same value.
+    """
+    if rng is None:
+        rng=np.random.default_rng()
+    sites=lattice.sites
+    src=np.repeat(np.arange(sites),lattice.degree)
+    dst=lattice.neighbours.ravel().astype(np.int64)
+    real=dst<sites
+    key=np.minimum(src,dst)*(sites+1)+np.maximum(src,dst)
+    bonds,inverse=np.unique(key[real],return_inverse=True)
+    if distribution=="bimodal":
+        values=np.where(rng.random(bonds.size)<p,-1.0,1.0)
+    elif distribution=="gaussian":
+        values=rng.standard_normal(bonds.size)
+    else:
+        raise ValueError("Unknown bond distribution: "+str(distribution))
+    couplings=np.zeros(src.size)
+    couplings[real]=values[inverse.reshape(-1)]
+    lattice.couplings=couplings.reshape(sites,lattice.degree)
+    return lattice
+
+def latticeSpins(lattice:Lattice, rng:np.random.Generator | None =None)->np.ndarray:
+    """
+    Random +/-1 spins for every site, plus the ghost site (always 0) at the end
+    """
+    if rng is None:
+        rng=np.random.default_rng()
+    spins=np.zeros(lattice.sites+1,dtype=np.int8)
+    spins[:-1]=rng.choice(np.array([-1,1],dtype=np.int8),size=lattice.sites)
+    return spins
+
+def localField(lattice:Lattice, spins:np.ndarray, sites:np.ndarray, neighbours:np.ndarray)->np.ndarray:
+    """
+    Return sum_j J_ij s_j / J over the neighbours of the given sites
+    """
+    if lattice.couplings is None:
+        return spins[neighbours].sum(axis=1,dtype=np.int64)
+    return np.sum(lattice.couplings[sites]*spins[neighbours],axis=1)
+
+def latticeHamiltonian(lattice:Lattice, J:float, spins:np.ndarray, H:float=0)->float:
+    """
+    Return the energy -J sum_<ij> J_ij s_i s_j - H sum_i s_i, counting every bond once
+    """
+    s=spins[:-1].astype(np.int64)
+    field=localField(lattice,spins,np.arange(lattice.sites),lattice.neighbours)
+    return float(-J*np.sum(s*field)/2-H*np.sum(s))
+
+def latticeMagnetisation(spins:np.ndarray)->int:
+    return int(np.sum(spins[:-1],dtype=np.int64))
+
+def latticeSweep(lattice:Lattice, J:float, T:float, H:float, spins:np.ndarray, rng:np.random.Generator, colourNeighbours:list[np.ndarray])->int:
+    """
+    One Metropolis sweep of every site in place, a colour class at a time. colourNeighbours[c] is
+    lattice.neighbours[lattice.colours[c]], precomputed once per run. Return the number of accepted flips.
+    """
+    accepted=0
+    for sites,neighbours in zip(lattice.colours,colourNeighbours):
+        s=spins[sites]
+        dE=2*s*(J*localField(lattice,spins,sites,neighbours)+H)
+        if T>0:
+            with np.errstate(over="ignore"):
+                accept=(dE<=0)|(rng.random(sites.size)<np.exp(-dE/T))
+        else:
+            accept=dE<=0
+        spins[sites[accept]]*=-1
+        accepted+=int(np.count_nonzero(accept))
+    return accepted
+
+def latticeMetropolis(lattice:Lattice, J:float, T:float, H:float=0, maxIters:int=1000, spins:np.ndarray | None =None, seed:int | None =None):
+    """
+    Metropolis Monte Carlo on any Lattice, the geometry independent counterpart of fastIsing.checkerboardMetropolis.
+    maxIters counts sweeps and every sweep is run (no early stop). spins defaults to a random start.
+
+    Return (spins, energies, magnetisations) with the energy and magnetisation recorded after every sweep; the spins on
+    the grid are spins[:-1].reshape(lattice.shape).
+
+    Note: kB=1, express T in units of the coupling strength J
+    """
+    rng=np.random.default_rng(seed)
+    if spins is None:
+        spins=latticeSpins(lattice,rng)
+    colourNeighbours=[lattice.neighbours[sites] for sites in lattice.colours]
+    energies=[]
+    magnetisations=[]
+    sweeps=0
+    while sweeps<maxIters:
+        latticeSweep(lattice,J,T,H,spins,rng,colourNeighbours)
+        energies.append(latticeHamiltonian(lattice,J,spins,H))
+        magnetisations.append(latticeMagnetisation(spins))
+        sweeps+=1
+    return spins, energies, magnetisations
+
+GEOMETRIES={"square":squareLattice, "cubic":cubicLattice, "triangular":triangularLattice, "honeycomb":honeycombLattice}
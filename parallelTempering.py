@@ -0,0 +1,130 @@
+import numpy as np
+import multiprocessing as mp
+import fastIsing as fI
+
+def temperatureLadder(Tmin:float, Tmax:float, M:int)->list[float]:
+    """
+    Return M temperatures from Tmin to Tmax spaced geometrically, which keeps swap acceptance roughly even along the ladder
+    """
+    return np.geomspace(Tmin,Tmax,M).tolist()
+
+def replicaRun(lattice:np.ndarray, J:float, H:float, rng:np.random.Generator, sites:list[tuple[np.ndarray,np.ndarray]] | None, table:np.ndarray, sweeps:int, measure:bool):
+    """
+    Advance one replica by a number of checkerboard sweeps at the temperature encoded in table.
+    Return (energy, sum of energies, sum of |M|) where the sums run over the sweeps and are zero unless measure is True.
+    """
+    sumE=0.0
+    sumAbsM=0.0
+    k=0
+    while k<sweeps:
+        fI.checkerboardSweep(lattice,rng,sites,table)
+        if measure:
+            sumE+=fI.arrayHamiltonian(J,lattice,H)
+            sumAbsM+=abs(fI.arrayMagnetisation(lattice))
+        k+=1
+    return fI.arrayHamiltonian(J,lattice,H), sumE, sumAbsM
+
+def replicaWorker(conn, N:int, J:float, H:float, seed):
+    """
+    Worker process loop holding one replica. It receives (T, sweeps, measure) jobs and answers with the result of
+    replicaRun, so only energies travel between processes. A None job ends the loop.
+    """
+    rng=np.random.default_rng(seed)
+    lattice=fI.arrayGridGen(N,rng)
+    sites=fI.checkerboardSites(N)
+    tables={}
+    while True:
+        job=conn.recv()
+        if job is None:
+            break
+        T,sweeps,measure=job
+        if T not in tables:
+            tables[T]=fI.acceptanceArray(J,T,H)
+        conn.send(replicaRun(lattice,J,H,rng,sites,tables[T],sweeps,measure))
+    conn.close()
+
+def parallelTempering(N:int, J:float, temps:list[float], H:float=0, sweeps:int=2000, swapEvery:int=10, burnIn:int | None =None, seed:int | None =None, workers:bool=False, show:bool=True):
+    """
+    Replica exchange Monte Carlo for the 2D Ising lattice. One replica runs at each temperature in temps using the
+    checkerboard Metropolis kernel of fastIsing. Every swapEvery sweeps, neighbouring temperatures attempt to swap
+    replicas with probability min(1, exp((1/T_k-1/T_k+1)(E_k-E_k+1))), alternating between even and odd pairs.
+    Swapping moves the temperature label rather than the lattice, so with workers=True every replica lives in its own
+    process and only energies are exchanged.
+
+    Measurements start after burnIn sweeps (half the run by default).
+    Return (temps, mags, energies, swapRates): mean |M| and mean E per temperature like tempMagnetisation,
+    and the swap acceptance rate of each neighbouring pair.
+    """
+    temps=sorted(temps)
+    M=len(temps)
+    if burnIn is None:
+        burnIn=sweeps//2
+    streams=np.random.SeedSequence(seed).spawn(M+1)
+    rng=np.random.default_rng(streams[M])
+    replicaAtTemp=list(range(M))
+    energies=np.zeros(M)
+    sumE=np.zeros(M)
+    sumAbsM=np.zeros(M)
+    counts=np.zeros(M)
+    swapTries=np.zeros(M-1)
+    swapAccepts=np.zeros(M-1)
+    if workers:
+        conns=[]
+        procs=[]
+        for r in range(M):
+            parent,child=mp.Pipe()
+            proc=mp.Process(target=replicaWorker,args=(child,N,J,H,streams[r]),daemon=True)
+            proc.start()
+            conns.append(parent)
+            procs.append(proc)
+    else:
+        replicaRngs=[np.random.default_rng(streams[r]) for r in range(M)]
+        lattices=[fI.arrayGridGen(N,replicaRngs[r]) for r in range(M)]
+        sites=fI.checkerboardSites(N)
+        tables=[fI.acceptanceArray(J,T,H) for T in temps]
+    done=0
+    rounds=0
+    while done<sweeps:
+        block=min(swapEvery,sweeps-done)
+        measure=done>=burnIn
+        if workers:
+            for k in range(M):
+                conns[replicaAtTemp[k]].send((temps[k],block,measure))
+            results=[conns[replicaAtTemp[k]].recv() for k in range(M)]
+        else:
+            results=[replicaRun(lattices[replicaAtTemp[k]],J,H,replicaRngs[replicaAtTemp[k]],sites,tables[k],block,measure) for k in range(M)]
+        for k in range(M):
+            energies[k],e,m=results[k]
+            sumE[k]+=e
+            sumAbsM[k]+=m
+            if measure:
+                counts[k]+=block
+        done+=block
+        for k in range(rounds%2,M-1,2):
+            delta=(1/temps[k]-1/temps[k+1])*(energies[k]-energies[k+1])
+            swapTries[k]+=1
+            if delta>=0 or rng.random()<np.exp(delta):
+                swapAccepts[k]+=1
+                replicaAtTemp[k],replicaAtTemp[k+1]=replicaAtTemp[k+1],replicaAtTemp[k]
+                energies[k],energies[k+1]=energies[k+1],energies[k]
+        rounds+=1
+    if workers:
+        for conn,proc in zip(conns,procs):
+            conn.send(None)
+            proc.join()
+    counts[counts==0]=np.nan
+    mags=(sumAbsM/counts).tolist()
+    meanEnergies=(sumE/counts).tolist()
+    swapRates=(swapAccepts/np.maximum(swapTries,1)).tolist()
+    if show:
+        import matplotlib.pyplot as plt
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12,6))
+        ax1.plot(temps,mags,color="black")
+        ax1.set_xlabel("Temperature")
+        ax1.set_ylabel("Magnetisation")
+        ax2.plot(temps,meanEnergies,color="black")
+        ax2.set_xlabel("Temperature")
+        ax2.set_ylabel("Energy")
+        fig.suptitle("Parallel Tempering, N="+str(N))
+        plt.show()
+    return temps, mags, meanEnergies, swapRates
@@ -0,0 +1,145 @@
+"""
+Single and multiple histogram (Ferrenberg-Swendsen / WHAM) reweighting for the 2D lattice. A run at (T, H) is reduced to a
+compact histogram of its (E, M) samples; one or more histograms are combined into an estimate of the density of states,
+from which <E>, <|M|>, the specific heat, susceptibility and Binder cumulant follow at any T and H in milliseconds.
+The estimates are only trustworthy where the simulated histograms overlap, i.e. between and close to the simulated temperatures.
+"""
+import numpy as np
+from scipy.special import logsumexp
+from concurrent.futures import ProcessPoolExecutor
+import fastIsing as fI
+import clusterIsing as cI
+
+def histogram(N:int, J:float, T:float, H:float, energies, magnetisations)->dict:
+    """
+    Bin the (E, M) samples of a run at temperature T and field H into a histogram dict. energies include the field term
+    -H*M as the solvers record them; the histogram keys on the field free part E0=E+H*M so it can be reweighted to another H.
+    """
+    M=np.asarray(magnetisations,dtype=np.int64)
+    E0=np.round(np.asarray(energies,dtype=float)+H*M,9)
+    pairs,counts=np.unique(np.stack([E0,M],axis=1),axis=0,return_counts=True)
+    return {"N":N, "J":J, "T":T, "H":H, "E0":pairs[:,0], "M":pairs[:,1].astype(np.int64), "counts":counts, "samples":int(M.size)}
+
+def histogramFromRun(N:int, J:float, T:float, H:float, result:dict, burnIn:int | None =None, spacing:int | None =None)->dict:
+    """
+    Histogram of a twoDIsing.metropolisRun result (as used by MagnetisationMetropolisFlips and the field solver).
+    One sample per sweep (spacing=N^2 attempts) is taken after burnIn attempts, which defaults to the burn-in found by an
+    equilibration monitor if the run had one and to half the run otherwise.
+    """
+    energies=result["energies"]
+    if spacing is None:
+        spacing=N*N
+    if burnIn is None:
+        burnIn=result["equilibration"]["burnIn"]*N*N if "equilibration" in result else len(energies)//2
+    return histogram(N,J,T,H,np.asarray(energies)[burnIn::spacing],np.asarray(result["magnetisations"])[burnIn::spacing])
+
+def histogramRun(N:int, J:float, T:float, H:float=0, sweeps:int=5000, burnIn:int | None =None, algorithm:str="metropolis", seed:int | None =None)->dict:
+    """
+    Simulate with the given algorithm (see clusterIsing.updater) and return the histogram of the sweeps after burnIn
+    (sweeps//5 by default)
+    """
+    if burnIn is None:
+        burnIn=sweeps//5
+    rng=np.random.default_rng(seed)
+    lattice=fI.arrayGridGen(N,rng)
+    step=cI.updater(N,J,T,H,lattice,rng,algorithm)
+    energies=np.empty(sweeps)
+    mags=np.empty(sweeps,dtype=np.int64)
+    k=0
+    while k<burnIn+sweeps:
+        step()
+        if k>=burnIn:
+            energies[k-burnIn]=fI.arrayHamiltonian(J,lattice,H)
+            mags[k-burnIn]=fI.arrayMagnetisation(lattice)
+        k+=1
+    return histogram(N,J,T,H,energies,mags)
+
+def densityOfStates(histograms:list[dict], tol:float=1e-10, maxIters:int=10000)->dict:
+    """
+    Combine histograms from runs at different (T, H) into the log density of states lnG over the union of their (E0, M) bins
+    by iterating the WHAM equations
+        lnG(x) = ln sum_k n_k(x) - ln sum_k N_k exp(f_k - (E0-H_k M)/T_k)
+        f_k = -ln sum_x G(x) exp(-(E0-H_k M)/T_k)
+    until the free energies f_k change by less than tol. A single histogram is the Ferrenberg-Swendsen case and needs one pass.
+    """
+    E0=np.concatenate([h["E0"] for h in histograms])
+    M=np.concatenate([h["M"] for h in histograms])
+    pairs,inverse=np.unique(np.stack([E0,M],axis=1),axis=0,return_inverse=True)
+    inverse=inverse.reshape(-1)
+    E0=pairs[:,0]
+    M=pairs[:,1]
+    K=len(histograms)
+    counts=np.zeros(pairs.shape[0])
+    exponents=np.empty((K,pairs.shape[0]))
+    start=0
+    for k,h in enumerate(histograms):
+        stop=start+h["counts"].size
+        np.add.at(counts,inverse[start:stop],h["counts"])
+        exponents[k]=-(E0-h["H"]*M)/h["T"]
+        start=stop
+    lnN=np.log([h["samples"] for h in histograms])
+    lnCounts=np.log(counts)
+    f=np.zeros(K)
+    iters=0
+    while iters<maxIters:
+        lnG=lnCounts-logsumexp(lnN[:,None]+f[:,None]+exponents,axis=0)
+        fNew=-logsumexp(lnG[None,:]+exponents,axis=1)
+        fNew-=fNew[0]
+        converged=np.max(np.abs(fNew-f))<tol
+        f=fNew
+        iters+=1
+        if converged:
+            break
+    return {"N":histograms[0]["N"], "J":histograms[0]["J"], "E0":E0, "M":M, "lnG":lnG, "f":f,
+            "temperatures":[h["T"] for h in histograms], "iterations":iters}
+
+def reweight(dos:dict, temps:list[float], H:float=0)->dict:
+    """
+    Evaluate the thermodynamics of a densityOfStates result at every temperature in temps and field H.
+    Return a dict of lists: "temperatures", the per-site "energy" and "magnetisation" (<|M|>), "specificHeat",
+    "susceptibility" (from <M^2>-<|M|>^2) and "binder" (1-<M^4>/(3<M^2>^2)).
+    """
+    temps=np.atleast_1d(np.asarray(temps,dtype=float))
+    sites=dos["N"]**2
+    M=dos["M"].astype(float)
+    E=dos["E0"]-H*M
+    lnW=dos["lnG"][None,:]-E[None,:]/temps[:,None]
+    p=np.exp(lnW-logsumexp(lnW,axis=1)[:,None])
+    meanE=p@E
+    meanE2=p@(E*E)
+    absM=p@np.abs(M)
+    M2=p@(M*M)
+    M4=p@(M**4)
+    return {"temperatures":temps.tolist(), "energy":(meanE/sites).tolist(), "magnetisation":(absM/sites).tolist(),
+            "specificHeat":((meanE2-meanE**2)/(sites*temps**2)).tolist(),
+            "susceptibility":((M2-absM**2)/(sites*temps)).tolist(),
+            "binder":(1-M4/(3*M2**2)).tolist()}
+
+def histogramWorker(args)->dict:
+    N,J,T,H,sweeps,algorithm,seed=args
+    return histogramRun(N,J,T,H,sweeps,None,algorithm,seed)
+
+def reweightedMagnetisationTemperature(N:int, J:float, Tmin:float, Tmax:float, dT:float, simTemps:list[float], H:float=0, sweeps:int=5000, algorithm:str="metropolis", workers:int | None =None, seed:int | None =None, show:bool=True)->dict:
+    """
+    Reweighted counterpart of tempMagnetisation.magnetisationTemperature: simulate only at simTemps (in parallel), combine
+    the histograms with densityOfStates and evaluate the curve on the fine grid Tmin..Tmax in steps of dT.
+    simTemps should cover the grid densely enough for neighbouring energy histograms to overlap (more points for larger N).
+    Return the reweight dict of the grid.
+    """
+    temps=[]
+    T=Tmin
+    while T<=Tmax:
+        temps.append(T)
+        T+=dT
+    streams=np.random.SeedSequence(seed).spawn(len(simTemps))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        histograms=list(pool.map(histogramWorker,[(N,J,Ts,H,sweeps,algorithm,streams[k]) for k,Ts in enumerate(simTemps)]))
+    results=reweight(densityOfStates(histograms),temps,H)
+    if show:
+        import matplotlib.pyplot as plt
+        plt.plot(results["temperatures"],np.array(results["magnetisation"])*N*N,color="black")
+        plt.title("Reweighted Magnetisation vs Temperature, N="+str(N))
+        plt.xlabel("Temperature")
+        plt.ylabel("Magnetisation")
+        plt.show()
+    return results
@@ -0,0 +1,104 @@
+"""
+Checkpoint/restart store for long single spin runs (see twoDIsing.metropolisRun). A store is a directory holding
+
+    lattice.npy       the N x N int8 lattice as a memory-mapped .npy file, written at every checkpoint
+    iterations.bin    append-only raw int64 array of iteration numbers
+    energies.bin      append-only raw float64 array of energies
+    magnetisations.bin  append-only raw int64 array of magnetisations
+    checkpoint.json   iteration counters, running totals, RNG state and run parameters
+
+Observables are buffered chunkSize samples at a time and appended to disk, so memory stays flat however long the run.
+On reopening, anything written after the last checkpoint is cut off so the run resumes exactly from that checkpoint.
+"""
+import json
+import os
+import numpy as np
+
+COLUMNS={"iterations":np.int64, "energies":np.float64, "magnetisations":np.int64}
+
+class RunStore:
+    def __init__(self, path:str, N:int, checkpointEvery:int=100000, chunkSize:int=65536):
+        self.path=path
+        self.N=N
+        self.checkpointEvery=max(1,checkpointEvery)
+        self.chunkSize=max(1,chunkSize)
+        os.makedirs(path,exist_ok=True)
+        self.buffers={name:np.empty(self.chunkSize,dtype=dtype) for name,dtype in COLUMNS.items()}
+        self.filled=0
+        self.bytesWritten=0
+        self.state=self.load()
+        self.count=self.state["samples"] if self.state is not None else 0
+        for name,dtype in COLUMNS.items():
+            file=self.column(name)
+            with open(file,"ab") as f:
+                f.truncate(self.count*np.dtype(dtype).itemsize)
+        latticeFile=os.path.join(path,"lattice.npy")
+        if os.path.exists(latticeFile):
+            self.lattice=np.load(latticeFile,mmap_mode="r+")
+            if self.lattice.shape!=(N,N):
+                raise ValueError("Run store "+path+" holds a "+str(self.lattice.shape)+" lattice, not "+str((N,N)))
+        else:
+            self.lattice=np.lib.format.open_memmap(latticeFile,mode="w+",dtype=np.int8,shape=(N,N))
+
+    def column(self, name:str)->str:
+        return os.path.join(self.path,name+".bin")
+
+    def load(self)->dict | None:
+        """
+        Return the state saved by the last checkpoint, or None for a fresh store
+        """
+        file=os.path.join(self.path,"checkpoint.json")
+        if not os.path.exists(file):
+            return None
+        with open(file) as f:
+            return json.load(f)
+
+    def append(self, iters:int, energy:float, mag:int):
+        """
+        Record one sample, writing the buffer to disk whenever it fills up
+        """
+        self.buffers["iterations"][self.filled]=iters
+        self.buffers["energies"][self.filled]=energy
+        self.buffers["magnetisations"][self.filled]=mag
+        self.filled+=1
+        if self.filled==self.chunkSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered samples to the column files
+        """
+        if self.filled==0:
+            return
+        for name in COLUMNS:
+            with open(self.column(name),"ab") as f:
+                self.buffers[name][:self.filled].tofile(f)
+                self.bytesWritten+=self.buffers[name][:self.filled].nbytes
+        self.count+=self.filled
+        self.filled=0
+
+    def checkpoint(self, lattice, state:dict):
+        """
+        Flush the samples, write the lattice to its memory map and save state (which must be JSON serialisable).
+        checkpoint.json is replaced atomically, so a run killed mid-checkpoint still resumes from the previous one.
+        """
+        self.flush()
+        self.lattice[:]=lattice
+        self.lattice.flush()
+        self.bytesWritten+=self.lattice.nbytes
+        self.state=dict(state,samples=self.count)
+        file=os.path.join(self.path,"checkpoint.json")
+        with open(file+".tmp","w") as f:
+            json.dump(self.state,f)
+        os.replace(file+".tmp",file)
+
+    def loadLattice(self)->list[list[int]]:
+        return self.lattice.tolist()
+
+    def observables(self)->tuple[np.ndarray,np.ndarray,np.ndarray]:
+        """
+        Return (iterations, energies, magnetisations) as read-only memory maps over everything flushed so far
+        """
+        self.flush()
+        return tuple(np.memmap(self.column(name),dtype=dtype,mode="r",shape=(self.count,)) if self.count else np.empty(0,dtype=dtype)
+                     for name,dtype in COLUMNS.items())
@@ -1,14 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from matplotlib.figure import Figure
-import imageio
-import random as rd
 import os
+from concurrent.futures import ProcessPoolExecutor
 import twoDIsing as tDI
+import fastIsing as fI
+import equilibration as eq
+import clusterIsing as cI
 
 
-def MagnetisationMetropolisFlips(N:int,J:float, T:float, maxIters:int=88000, verbosity:bool=False, lattice:list[list[int]] | None =None):
+def MagnetisationMetropolisFlips(N:int,J:float, T:float, maxIters:int=88000, verbosity:bool=False, lattice:list[list[int]] | None =None, checkEvery:int=0, seed:int | None =None, targetError:float | None =None):
     """
     Return the magnetisation of the lattice in its thermal equillibrium state under temperature T and coupling strength J. 
     Solve using the Monte Carlo method, implementing the Metropolis model of interaction* 
@@ -17,62 +16,48 @@ def MagnetisationMetropolisFlips(N:int,J:float, T:float, maxIters:int=88000, ver
     energy raised by the flip
 
     Note: kB=1, express T in units of the coupling strength J
+
+    Runs twoDIsing.metropolisRun (see there for checkEvery and seed), stopping after 160 rejected flips in a row. 
+    With targetError set, an equilibration.EquilibrationMonitor decides instead: the run stops once the error of the 
+    mean |M| per site is below targetError and that mean (past the detected burn-in) is returned, or nan if the run 
+    ran out of maxIters before it equilibrated. 
+    """
+    if targetError is None:
+        result=tDI.metropolisRun(N,J,T,0,maxIters,lattice,seed,160,checkEvery,None,verbosity)
+        return abs(result["magnetisation"])
+    monitor=eq.EquilibrationMonitor(N*N,targetError)
+    result=tDI.metropolisRun(N,J,T,0,maxIters,lattice,seed,160,checkEvery,None,verbosity,monitor=monitor)
+    if not result["equilibration"]["equilibrated"]:
+        return float("nan")
+    return result["equilibration"]["meanM"]*N*N
+
+def clusterMagnetisation(N:int,J:float,T:float,maxIters:int=1000,algorithm:str="wolff",seed:int | None =None,targetError:float | None =None)->float:
+    """
+    Return the mean |M| of an NxN lattice at temperature T from a cluster update run (see clusterIsing.simulate), 
+    averaged over the second half of the run so the first half serves as burn-in. 
+    With targetError set, the burn-in and stopping point come from an equilibration.EquilibrationMonitor as in 
+    MagnetisationMetropolisFlips. 
     """
-    energies=[]
-    iterationList=[]
-    if lattice==None:
-        lattice=tDI.gridGen(N)
-    energyStable=0 
-    iters=0
-    while energyStable<=160 and iters<=maxIters:
-        i=rd.randint(0,N-1)
-        j=rd.randint(0,N-1)
-        if verbosity:
-            print("Trying to flip ", (j,i))
-        lattice[i][j]=-lattice[i][j]
-        newEnergy= tDI.hamiltonian(N,J,lattice)
-        energies.append(newEnergy)
-        iterationList.append(iters)
-        f = (lattice[(i+1)%N][j] +lattice[(i-1)%N][j] +lattice[i][(j+1)%N] +lattice[i][(j-1)%N])
-        dE=-2*J*lattice[i][j]*f
-        if verbosity:
-            print("Energy change if successsful:", dE)
-        if dE>0:
-            b=1/T
-            transProb=np.exp(-b*dE)
-            r=rd.random()
-            if r>transProb:
-                lattice[i][j]=-lattice[i][j] #flip back the lattice to original
-                dE=0
-                energyStable+=1
-                if verbosity:
-                    print("Flip failed")
-            else:
-                energyStable=0
-                if verbosity:
-                    print("Flip successful")
-        elif dE<=0:
-            energyStable=0
-            if verbosity:
-                print("Flip successful")
-        if verbosity:
-            for line in lattice:
-                print(line)
-      #  print(30*"\n","Solver running. Do not close or interrupt program.\n Iteration ", iters, "out of a maximum possibility of ", maxIters,"\n Equilibrium not reached yet. Current energy=", newEnergy, "Current Temperature=", T)
-        if verbosity:
-            print("Energy change from flip: ", dE)
-            print("Energy: ", newEnergy)
-            print("No Change Counter: ", energyStable)
-   #     print(30*"=")
-        iters+=1
-    return abs(tDI.magnetisation(N, lattice))
+    if targetError is None:
+        lattice,energies,mags=cI.simulate(N,J,T,0,maxIters,None,seed,algorithm)
+        return float(np.mean(np.abs(mags[len(mags)//2:])))
+    monitor=eq.EquilibrationMonitor(N*N,targetError)
+    cI.simulate(N,J,T,0,maxIters,None,seed,algorithm,monitor)
+    summary=monitor.summary()
+    if not summary["equilibrated"]:
+        return float("nan")
+    return summary["meanM"]*N*N
 
-def magnetisationTemperature(N:int,J:float,Tmin:float,Tmax:float,dT:float):
+def magnetisationTemperature(N:int,J:float,Tmin:float,Tmax:float,dT:float,algorithm:str="metropolis",clusterIters:int=1000,progress:bool=True,show:bool=True):
     """
     Plot magnetisation vs temperature for an NxN lattice
-    Very memory intensive. Do not exceed N=5. 
+    The metropolis path gives each temperature at most 88000 single spin attempts (see MagnetisationMetropolisFlips), 
+    only 88000/N^2 sweeps, so larger lattices come out unequilibrated; use a cluster algorithm for those. 
 
-    Comment out any calls to functions outside of the functions in twoDIsing.py before running this function
+    algorithm="wolff" or "swendsenwang" uses cluster updates with clusterIters iterations per temperature instead 
+    of single spin flips, which converge far better near the critical temperature. 
+
+    Set progress or show to False to run without status output or the plot. 
     """
     T=Tmin
     i=0
@@ -80,20 +65,108 @@ def magnetisationTemperature(N:int,J:float,Tmin:float,Tmax:float,dT:float):
     mags=[]
     while T<=Tmax:
         temps.append(T)
-        mags.append(MagnetisationMetropolisFlips(N,J,T))
-        print(30*"\n", "Solver running...")
-        print("Current Temperature=", T, "|| Maximum Temperature=", Tmax)
+        if algorithm=="metropolis":
+            mags.append(MagnetisationMetropolisFlips(N,J,T))
+        else:
+            mags.append(clusterMagnetisation(N,J,T,clusterIters,algorithm))
+        if progress:
+            print(30*"\n", "Solver running...")
+            print("Current Temperature=", T, "|| Maximum Temperature=", Tmax)
         T+=dT
         i+=1
-    print(30*"\n")
-    print("Solving complete. See output plot for results.")
-    plt.plot(temps,mags,color="black")
-    plt.title("Magnetisation vs Temperature, N="+str(N))
-    plt.xlabel("Temperature")
-    plt.ylabel("Magnetisation")
-    plt.show()
+    if progress:
+        print(30*"\n")
+        print("Solving complete.")
+    if show:
+        import matplotlib.pyplot as plt
+        plt.plot(temps,mags,color="black")
+        plt.title("Magnetisation vs Temperature, N="+str(N))
+        plt.xlabel("Temperature")
+        plt.ylabel("Magnetisation")
+        plt.show()
     return temps, mags
 
+def sweepWorker(args)->float:
+    """
+    Run one (temperature, replica) job of parallelMagnetisationTemperature inside a worker process and return |M|
+    """
+    N,J,T,algorithm,clusterIters,seed,targetError=args
+    if algorithm=="metropolis":
+        return MagnetisationMetropolisFlips(N,J,T,seed=seed,targetError=targetError)
+    return clusterMagnetisation(N,J,T,clusterIters,algorithm,seed,targetError)
+
+def parallelMagnetisationTemperature(N:int,J:float,Tmin:float,Tmax:float,dT:float,replicas:int=1,workers:int | None =None,seed:int | None =None,algorithm:str="metropolis",clusterIters:int=1000,progress:bool=True,show:bool=True,targetError:float | None =None):
+    """
+    Parallel version of magnetisationTemperature. Every (temperature, replica) pair is an independent run, so the runs are 
+    farmed out to a pool of worker processes (one per core unless workers is given). 
+    Each run gets its own random stream spawned from seed, so a fixed seed reproduces the whole sweep. 
+
+    Return (temps, mags, errors) in temperature order, where mags is the mean |M| over the replicas and errors is 
+    its standard error (zero when replicas=1). targetError switches every run to equilibration detection (see 
+    MagnetisationMetropolisFlips); runs that never equilibrate come back as nan and are left out of the averages. 
+    """
+    temps=[]
+    T=Tmin
+    while T<=Tmax:
+        temps.append(T)
+        T+=dT
+    streams=np.random.SeedSequence(seed).spawn(len(temps)*replicas)
+    jobs=[]
+    for k,T in enumerate(temps):
+        for r in range(replicas):
+            jobs.append((N,J,T,algorithm,clusterIters,streams[k*replicas+r],targetError))
+    if progress:
+        print("Solver running on", len(jobs), "jobs...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results=np.array(list(pool.map(sweepWorker,jobs,chunksize=max(1,len(jobs)//(4*(workers or os.cpu_count() or 1))))),dtype=float)
+    results=results.reshape(len(temps),replicas)
+    mags=np.nanmean(results,axis=1)
+    if replicas>1:
+        errors=np.nanstd(results,axis=1,ddof=1)/np.sqrt(np.sum(~np.isnan(results),axis=1))
+    else:
+        errors=np.zeros(len(temps))
+    if progress:
+        print("Solving complete.")
+    if show:
+        import matplotlib.pyplot as plt
+        plt.errorbar(temps,mags,yerr=errors,color="black",capsize=2)
+        plt.title("Magnetisation vs Temperature, N="+str(N))
+        plt.xlabel("Temperature")
+        plt.ylabel("Magnetisation")
+        plt.show()
+    return temps, mags.tolist(), errors.tolist()
+
+def batchMagnetisationTemperature(N:int,J:float,Tmin:float,Tmax:float,dT:float,replicas:int=1,sweeps:int=2000,burnIn:int | None =None,H:float=0,seed:int | None =None,show:bool=True):
+    """
+    Single process alternative to parallelMagnetisationTemperature for small lattices: every (temperature, replica) pair 
+    becomes one lattice of a fastIsing.batchMetropolis batch, so the whole sweep is one array workload. 
+    |M| is averaged over the sweeps after burnIn (sweeps//4 by default). 
+
+    Return (temps, mags, errors) like parallelMagnetisationTemperature. 
+    """
+    temps=[]
+    T=Tmin
+    while T<=Tmax:
+        temps.append(T)
+        T+=dT
+    if burnIn is None:
+        burnIn=sweeps//4
+    lattices,energies,magnetisations=fI.batchMetropolis(N,J,np.repeat(temps,replicas),H,sweeps,None,seed)
+    results=np.abs(magnetisations[burnIn:]).mean(axis=0).reshape(len(temps),replicas)
+    mags=results.mean(axis=1)
+    if replicas>1:
+        errors=results.std(axis=1,ddof=1)/np.sqrt(replicas)
+    else:
+        errors=np.zeros(len(temps))
+    if show:
+        import matplotlib.pyplot as plt
+        plt.errorbar(temps,mags,yerr=errors,color="black",capsize=2)
+        plt.title("Magnetisation vs Temperature, N="+str(N))
+        plt.xlabel("Temperature")
+        plt.ylabel("Magnetisation")
+        plt.show()
+    return temps, mags.tolist(), errors.tolist()
+
 def terminalMagnetisationTemp():
     print(100*"=")
     print("Welcome to the Magnetisation-Temperature Plotter")
@@ -106,4 +179,5 @@ def terminalMagnetisationTemp():
     return magnetisationTemperature(N,J,Tmin,Tmax,dT)
 
 #magnetisationTemperature(10,1,1.5,3.2,0.01)
-terminalMagnetisationTemp()
\ No newline at end of file
+if __name__=="__main__":
+    terminalMagnetisationTemp()
\ No newline at end of file
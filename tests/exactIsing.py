@@ -0,0 +1,32 @@
+"""
+Exact thermodynamics of small periodic N x N lattices by enumerating all 2^(N^2) states, for the engine tests to check
+their samples against
+"""
+from functools import lru_cache
+import numpy as np
+import fastIsing as fI
+
+@lru_cache(maxsize=None)
+def states(N:int)->tuple[np.ndarray,np.ndarray]:
+    """
+    Return the bond sum and magnetisation of every +/-1 state of the periodic N x N lattice
+    """
+    index=np.arange(2**(N*N))[:,None]
+    lattices=(1-2*((index>>np.arange(N*N))&1)).astype(np.int8).reshape(-1,N,N)
+    return fI.batchHamiltonian(-1,lattices), fI.batchMagnetisation(lattices)
+
+def boltzmannWeights(N:int, J:float, T:float, H:float=0)->tuple[np.ndarray,np.ndarray,np.ndarray]:
+    """
+    Return the normalised Boltzmann weights of every state with their energies and magnetisations
+    """
+    bonds,mags=states(N)
+    energies=-J*bonds-H*mags
+    weights=np.exp(-(energies-energies.min())/T)
+    return weights/weights.sum(), energies, mags
+
+def exact(N:int, J:float, T:float, H:float=0)->tuple[float,float]:
+    """
+    Return the exact <E>/N^2 and <|M|>/N^2
+    """
+    weights,energies,mags=boltzmannWeights(N,J,T,H)
+    return weights@energies/N**2, weights@np.abs(mags)/N**2
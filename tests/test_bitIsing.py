@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import bitIsing as bI
+import fastIsing as fI
+from exactIsing import exact
+
+def packedSamples(N, J, T, H, sweeps, seed):
+    """
+    packedMetropolis stops on a sweep without flips, which small lattices hit now and then, so keep restarting it from
+    its last lattice
+    """
+    packed=None
+    energies=[]
+    mags=[]
+    k=0
+    while len(energies)<sweeps:
+        packed,e,m=bI.packedMetropolis(N,J,T,H,sweeps-len(energies),packed,seed+k)
+        energies.extend(e)
+        mags.extend(np.abs(m))
+        k+=1
+    return np.array(energies), np.array(mags)
+
+@pytest.mark.parametrize("N",[4])
+@pytest.mark.parametrize("T",[1.8,2.5])
+def test_packed_matches_exact(N, T):
+    E,M=packedSamples(N,1.0,T,0,12000,3)
+    exactE,exactM=exact(N,1.0,T)
+    assert E[1000:].mean()/N**2==pytest.approx(exactE,abs=0.02)
+    assert M[1000:].mean()/N**2==pytest.approx(exactM,abs=0.02)
+
+def test_packed_is_reproducible():
+    first=bI.packedMetropolis(16,1.0,2.3,0,50,seed=5)
+    second=bI.packedMetropolis(16,1.0,2.3,0,50,seed=5)
+    assert np.array_equal(first[0],second[0]) and first[1]==second[1]
+
+def test_packed_agrees_with_array_observables():
+    rng=np.random.default_rng(6)
+    lattice=fI.arrayGridGen(16,rng)
+    packed=bI.packLattice(lattice)
+    assert np.array_equal(bI.unpackLattice(16,packed),lattice)
+    assert bI.packedHamiltonian(16,1.0,packed,0.3)==pytest.approx(fI.arrayHamiltonian(1.0,lattice,0.3))
+    assert bI.packedMagnetisation(16,packed)==fI.arrayMagnetisation(lattice)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+import clusterIsing as cI
+import equilibration as eq
+from exactIsing import exact
+
+def within(samples, expected, sigmas=4):
+    """
+    True when the mean of samples lies within sigmas autocorrelation-corrected standard errors of expected
+    """
+    samples=np.asarray(samples,dtype=float)
+    err=np.std(samples)*np.sqrt(2*eq.integratedAutocorrelationTime(samples)/samples.size)
+    return abs(samples.mean()-expected)<=sigmas*err+1e-9
+
+@pytest.mark.parametrize("algorithm",["wolff","swendsenwang"])
+@pytest.mark.parametrize("N",[3,4])
+@pytest.mark.parametrize("J,T,H",[(1.0,2.3,0),(1.0,3.5,0.4),(-1.0,2.0,0)])
+def test_cluster_matches_exact(algorithm, N, J, T, H):
+    lattice,energies,mags=cI.clusterMetropolis(N,J,T,H,4000,None,4,algorithm)
+    exactE,exactM=exact(N,J,T,H)
+    assert within(np.array(energies[200:])/N**2,exactE)
+    assert within(np.abs(mags[200:])/N**2,exactM)
+
+@pytest.mark.parametrize("algorithm",["wolff","swendsenwang"])
+def test_cluster_is_reproducible(algorithm):
+    first=cI.clusterMetropolis(16,1.0,2.3,0,50,None,5,algorithm)
+    second=cI.clusterMetropolis(16,1.0,2.3,0,50,None,5,algorithm)
+    assert np.array_equal(first[0],second[0]) and first[1]==second[1]
+
+def test_neighbour_table():
+    neighbours=cI.neighbourTable(3)
+    assert neighbours[0].tolist()==[3,6,1,2]
+    assert neighbours[4].tolist()==[7,1,5,3]
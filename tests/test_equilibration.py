@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import equilibration as eq
+
+def ar1(n:int, phi:float, seed:int, start:float=0.0)->np.ndarray:
+    """
+    AR(1) series x_t=phi*x_(t-1)+noise with unit variance, whose integrated autocorrelation time is (1+phi)/(2(1-phi))
+    """
+    rng=np.random.default_rng(seed)
+    noise=rng.normal(0,np.sqrt(1-phi*phi),n)
+    x=np.empty(n)
+    x[0]=start
+    for t in range(1,n):
+        x[t]=phi*x[t-1]+noise[t]
+    return x
+
+def feed(monitor:eq.EquilibrationMonitor, E:np.ndarray, M:np.ndarray)->int:
+    """
+    Add samples until the monitor stops the run; return how many it took (len(E) if it never does)
+    """
+    for t in range(E.size):
+        if monitor.add(E[t],M[t]):
+            return t+1
+    return E.size
+
+def test_integrated_time_of_ar1():
+    x=ar1(200000,0.8,1)
+    assert eq.integratedAutocorrelationTime(x)==pytest.approx(4.5,rel=0.1)
+
+@pytest.mark.parametrize("seed",[2,3,4])
+def test_monitor_stops_at_target_error(seed):
+    E=ar1(400000,0.8,seed)
+    M=5+ar1(400000,0.5,seed+100)
+    monitor=eq.EquilibrationMonitor(1,targetError=0.01)
+    stop=feed(monitor,E,M)
+    assert monitor.done and stop<E.size
+    result=monitor.result
+    assert result["equilibrated"]
+    assert result["errE"]<=0.01 and result["errM"]<=0.01
+    assert result["tauE"]==pytest.approx(4.5,rel=0.5)
+    assert abs(result["meanE"])<=4*result["errE"] and abs(result["meanM"]-5)<=4*result["errM"]
+    # the error estimate 1/sqrt(n/(2 tau)) of a unit variance series needs roughly 2*4.5/0.01^2 samples
+    assert 0.5*90000<=stop<=4*90000
+
+def test_monitor_cuts_the_transient():
+    n=200000
+    transient=np.exp(-np.arange(n)/2000.0)*10
+    E=ar1(n,0.5,5)+transient
+    M=1+ar1(n,0.5,6)+transient
+    monitor=eq.EquilibrationMonitor(1,targetError=0.02)
+    feed(monitor,E,M)
+    assert monitor.done
+    assert monitor.result["burnIn"]>=4000
+    assert abs(monitor.result["meanE"])<=4*monitor.result["errE"]
+
+def test_monitor_never_stops_on_a_drift():
+    n=100000
+    E=ar1(n,0.5,7)+np.linspace(0,100,n)
+    M=1+ar1(n,0.5,8)
+    monitor=eq.EquilibrationMonitor(1,targetError=0.05)
+    assert feed(monitor,E,M)==n
+    assert not monitor.summary()["equilibrated"]
+
+def test_constant_series_equilibrates():
+    monitor=eq.EquilibrationMonitor(4,targetError=0.01)
+    assert feed(monitor,np.full(1000,-8.0),np.full(1000,4.0))<1000
+    assert monitor.result["meanE"]==-2.0 and monitor.result["errE"]==0.0
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import fastIsing as fI
+from exactIsing import exact
+
+def checkerboardSamples(N, J, T, H, sweeps, seed):
+    rng=np.random.default_rng(seed)
+    lattice=fI.arrayGridGen(N,rng)
+    sites=fI.checkerboardSites(N)
+    table=fI.acceptanceArray(J,T,H)
+    energies=[]
+    mags=[]
+    k=0
+    while k<sweeps:
+        fI.checkerboardSweep(lattice,rng,sites,table)
+        energies.append(fI.arrayHamiltonian(J,lattice,H))
+        mags.append(abs(fI.arrayMagnetisation(lattice)))
+        k+=1
+    return np.array(energies), np.array(mags)
+
+@pytest.mark.parametrize("N",[3,4])
+@pytest.mark.parametrize("T,H",[(1.8,0),(2.5,0),(3.5,0.4)])
+def test_checkerboard_matches_exact(N, T, H):
+    E,M=checkerboardSamples(N,1.0,T,H,20000,1)
+    exactE,exactM=exact(N,1.0,T,H)
+    assert E[1000:].mean()/N**2==pytest.approx(exactE,abs=0.02)
+    assert M[1000:].mean()/N**2==pytest.approx(exactM,abs=0.02)
+
+def test_checkerboard_is_reproducible():
+    first=fI.checkerboardMetropolis(16,1.0,2.3,0,50,seed=5)
+    second=fI.checkerboardMetropolis(16,1.0,2.3,0,50,seed=5)
+    assert np.array_equal(first[0],second[0]) and first[1]==second[1]
+
+@pytest.mark.parametrize("N",[3,4])
+def test_batch_matches_exact(N):
+    temps=[1.8,2.5,3.5]
+    lattices,energies,mags=fI.batchMetropolis(N,1.0,temps*4,0,20000,seed=2)
+    for r,T in enumerate(temps):
+        exactE,exactM=exact(N,1.0,T)
+        assert energies[1000:,r::3].mean()/N**2==pytest.approx(exactE,abs=0.02)
+        assert np.abs(mags[1000:,r::3]).mean()/N**2==pytest.approx(exactM,abs=0.02)
+
+def test_batch_is_reproducible():
+    first=fI.batchMetropolis(8,1.0,[2.0,2.5],0,50,seed=5)
+    second=fI.batchMetropolis(8,1.0,[2.0,2.5],0,50,seed=5)
+    assert all(np.array_equal(a,b) for a,b in zip(first,second))
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import finiteSize as fS
+from exactIsing import boltzmannWeights
+
+def exactDerived(N, J, T):
+    """
+    Exact [e, |m|, C, chi, U] per site from the moments of the enumerated states
+    """
+    weights,energies,mags=boltzmannWeights(N,J,T)
+    mags=mags.astype(float)
+    moments=np.array([weights@energies,weights@energies**2,weights@np.abs(mags),weights@mags**2,weights@mags**4])
+    return fS.derived(moments,N*N,T)[0]
+
+def test_block_means_and_linear_jackknife():
+    rng=np.random.default_rng(1)
+    E=rng.normal(-10,2,1000)
+    M=rng.normal(3,1,1000)
+    acc=fS.MomentAccumulator(10,100)
+    for e,m in zip(E,M):
+        acc.add(e,m)
+    assert np.allclose(acc.means[:,0],E.reshape(10,100).mean(axis=1))
+    assert np.allclose(acc.means[:,4],(M**4).reshape(10,100).mean(axis=1))
+    value,error=fS.jackknife(acc,4,2.0)
+    # for a plain mean over equal blocks the jackknife error is the standard error of the block means
+    blocks=E.reshape(10,100).mean(axis=1)/4
+    assert value[0]==pytest.approx(E.mean()/4)
+    assert error[0]==pytest.approx(np.std(blocks,ddof=1)/np.sqrt(10))
+
+def test_derived_known_limits():
+    # fully ordered: |M|=sites always, so chi=0 and U=2/3
+    sites=16
+    e,m,C,chi,U=fS.derived(np.array([-32.0,1024.0,16.0,256.0,65536.0]),sites,1.5)[0]
+    assert (e,m,C,chi)==(-2.0,1.0,0.0,0.0)
+    assert U==pytest.approx(2/3)
+
+@pytest.mark.parametrize("T",[2.0,3.0])
+def test_fss_matches_exact(T):
+    [row]=fS.finiteSizeScaling([4],[T],1.0,20000,2000,"metropolis",20,1,3,None,False)
+    exact=exactDerived(4,1.0,T)
+    for name,x in zip(["e","absM","C","chi","U"],exact):
+        assert abs(row[name]-x)<=4*row[name+"_err"],name
+        assert row[name+"_err"]<0.05*max(abs(x),0.1),name
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import clusterIsing as cI
+import flipLog as fL
+import twoDIsing as tDI
+
+def test_single_spin_replay(tmp_path):
+    log=fL.FlipLog(str(tmp_path),12,1.0,0.25,keyframeEvery=4000,chunkSize=500)
+    result=tDI.metropolisRun(12,1.0,2.4,0.25,30000,seed=8,stableLimit=10**9,flipLog=log)
+    replay=fL.FlipReplay(str(tmp_path))
+    assert replay.lastIteration==30000
+    assert np.array_equal(replay.latticeAt(-1),replay.snapshots[0])
+    assert np.array_equal(replay.latticeAt(replay.lastIteration),np.array(result["lattice"]))
+    for workers in [1,2]:
+        iterations,energies,mags=replay.observables(workers=workers)
+        assert np.array_equal(iterations,result["iterations"])
+        assert np.allclose(energies,result["energies"])
+        assert np.array_equal(mags,result["magnetisations"])
+    picks=[0,1,3999,4000,4001,17777,30000]
+    for t,lattice in zip(picks,replay.lattices(picks)):
+        assert np.array_equal(lattice,replay.latticeAt(t))
+        assert int(lattice.sum())==result["magnetisations"][t]
+    with pytest.raises(ValueError):
+        replay.latticeAt(30001)
+
+@pytest.mark.parametrize("algorithm",["metropolis","wolff","swendsenwang"])
+def test_array_engine_replay(tmp_path, algorithm):
+    log=fL.FlipLog(str(tmp_path),16,1.0,0.0,keyframeEvery=7)
+    lattice,energies,mags=cI.simulate(16,1.0,2.4,0,40,None,9,algorithm,flipLog=log)
+    replay=fL.FlipReplay(str(tmp_path))
+    iterations,replayEnergies,replayMags=replay.observables(workers=1)
+    assert np.array_equal(iterations,np.arange(len(energies)))
+    assert np.allclose(replayEnergies,energies)
+    assert np.array_equal(replayMags,mags)
+    assert np.array_equal(replay.latticeAt(replay.lastIteration),lattice)
+
+def test_render_video(tmp_path):
+    pytest.importorskip("imageio")
+    log=fL.FlipLog(str(tmp_path/"log"),8,1.0,keyframeEvery=500)
+    tDI.metropolisRun(8,1.0,2.4,0,3000,seed=1,stableLimit=10**9,flipLog=log)
+    frames=fL.FlipReplay(str(tmp_path/"log")).renderVideo(str(tmp_path/"run.mp4"),frameEvery=250,workers=1)
+    assert frames==13
+    assert (tmp_path/"run.mp4").stat().st_size>0
+
+def test_field_solver_writes_flip_log(tmp_path):
+    import twoDIsing_MagField as tDM
+    path=str(tmp_path/"log")
+    tDM.metropolisMagnetisation(6,1.0,2.0,0.3,20000,verbosity=False,seed=3,progress=False,video=False,show=False,flipLogPath=path)
+    result=tDI.metropolisRun(6,1.0,2.0,0.3,20000,seed=3,stableLimit=69*6)
+    replay=fL.FlipReplay(path)
+    assert replay.lastIteration==result["iterations"][-1]
+    assert np.array_equal(replay.latticeAt(replay.lastIteration),np.array(result["lattice"]))
+    assert np.allclose(replay.observables(workers=1)[1],result["energies"])
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import fastIsing as fI
+import latticeGeometry as lG
+
+def bondList(lattice):
+    """
+    Every bond (i, j) with i<j, from the neighbour table
+    """
+    src=np.repeat(np.arange(lattice.sites),lattice.degree)
+    dst=lattice.neighbours.ravel()
+    real=(dst<lattice.sites)&(src<dst)
+    return src[real], dst[real]
+
+@pytest.mark.parametrize("make,L,site,expected",[
+    (lG.squareLattice,3,4,[7,1,5,3]),
+    (lG.triangularLattice,3,4,[7,1,5,3,6,2]),
+    (lG.cubicLattice,3,13,[22,4,16,10,14,12]),
+    (lG.honeycombLattice,4,0,[1,3,4]),
+    (lG.honeycombLattice,4,1,[2,0,13])])
+def test_periodic_neighbours(make, L, site, expected):
+    assert make(L).neighbours[site].tolist()==expected
+
+@pytest.mark.parametrize("make,L,site,expected",[
+    (lG.squareLattice,3,0,[3,9,1,9]),
+    (lG.triangularLattice,3,0,[3,9,1,9,9,9]),
+    (lG.cubicLattice,2,0,[4,8,2,8,1,8]),
+    (lG.honeycombLattice,3,0,[1,9,3])])
+def test_open_boundaries_point_at_the_ghost(make, L, site, expected):
+    assert make(L,False).neighbours[site].tolist()==expected
+
+@pytest.mark.parametrize("name,L,z,colours",[("square",4,4,2),("cubic",4,6,2),("triangular",6,6,3),("honeycomb",4,3,2)])
+@pytest.mark.parametrize("periodic",[True,False])
+def test_tables_are_symmetric_and_coloured(name, L, z, colours, periodic):
+    lattice=lG.GEOMETRIES[name](L,periodic)
+    assert lattice.degree==z
+    table=lattice.neighbours
+    for i in range(lattice.sites):
+        real=table[i][table[i]<lattice.sites]
+        assert i not in real and len(set(real.tolist()))==real.size
+        assert all(i in table[j] for j in real)
+    if periodic:
+        assert bondList(lattice)[0].size==lattice.sites*z//2
+        # greedy colouring is valid but not always minimal (4 classes on the triangular lattice)
+        assert colours<=len(lattice.colours)<=z+1
+    coloured=np.concatenate(lattice.colours)
+    assert np.array_equal(np.sort(coloured),np.arange(lattice.sites))
+    for sites in lattice.colours:
+        assert not np.isin(table[sites],sites).any()
+
+def test_square_energy_matches_fastIsing():
+    lattice=lG.squareLattice(8)
+    spins=lG.latticeSpins(lattice,np.random.default_rng(1))
+    grid=spins[:-1].reshape(8,8)
+    assert lG.latticeHamiltonian(lattice,1.0,spins,0.3)==pytest.approx(fI.arrayHamiltonian(1.0,grid,0.3))
+    assert lG.latticeMagnetisation(spins)==fI.arrayMagnetisation(grid)
+
+def test_random_bonds_are_symmetric():
+    lattice=lG.randomBonds(lG.triangularLattice(4),np.random.default_rng(2))
+    for i in range(lattice.sites):
+        for k,j in enumerate(lattice.neighbours[i]):
+            back=list(lattice.neighbours[j]).index(i)
+            assert lattice.couplings[i,k]==lattice.couplings[j,back]
+    assert set(np.unique(lattice.couplings).tolist())=={-1.0,1.0}
+
+@pytest.mark.parametrize("name,L,T",[("triangular",4,4.0),("honeycomb",4,2.0)])
+def test_metropolis_matches_exact(name, L, T):
+    lattice=lG.GEOMETRIES[name](L)
+    i,j=bondList(lattice)
+    index=np.arange(2**lattice.sites)[:,None]
+    states=1-2*((index>>np.arange(lattice.sites))&1)
+    energies=-np.sum(states[:,i]*states[:,j],axis=1)
+    weights=np.exp(-(energies-energies.min())/T)
+    weights/=weights.sum()
+    spins,E,M=lG.latticeMetropolis(lattice,1.0,T,0,8000,seed=3)
+    assert np.mean(E[500:])/lattice.sites==pytest.approx(weights@energies/lattice.sites,abs=0.02)
+    assert np.mean(np.abs(M[500:]))/lattice.sites==pytest.approx(weights@np.abs(states.sum(axis=1))/lattice.sites,abs=0.02)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import oneDIsing as oDI
+
+CASES=[(J,h,periodic) for J,h in [(1.0,0.7),(-1.0,0.4),(1.0,-1.3),(0.5,0.0)] for periodic in [False,True]]
+
+def denseSpectrum(N, J, h, periodic):
+    return np.linalg.eigvalsh(oDI.qubitInteractions(N,J,periodic)+oDI.fieldInteractions(N,h))
+
+def matchesDense(backend, J, h, periodic):
+    """
+    Check the 4 lowest energies (N=6) and the ground state spins (N=7) of backend against the dense solver
+    """
+    E=oDI.hamiltonian(6,J,h,False,backend,4,periodic)["Energy Eigenvalues"]
+    assert np.allclose(np.sort(np.real(E))[:4],denseSpectrum(6,J,h,periodic)[:4],atol=1e-8)
+    if h!=0:
+        assert np.allclose(oDI.spin(7,J,h,False,backend,periodic),oDI.spin(7,J,h,False,"dense",periodic),atol=2e-5)
+
+@pytest.mark.parametrize("J,h,periodic",CASES)
+def test_sparse_matches_dense(J, h, periodic):
+    matchesDense("sparse",J,h,periodic)
+
+@pytest.mark.parametrize("J,h,periodic",CASES)
+def test_matrixfree_matches_dense(J, h, periodic):
+    matchesDense("matrixfree",J,h,periodic)
+
+@pytest.mark.parametrize("J,h,periodic",CASES)
+def test_symmetry_matches_dense(J, h, periodic):
+    matchesDense("symmetry",J,h,periodic)
+
+@pytest.mark.parametrize("periodic",[False,True])
+def test_symmetry_sectors_cover_spectrum(periodic):
+    N,J,h=7,1.0,0.6
+    energies=[]
+    for parity,momentum in oDI.symmetrySectors(N,periodic):
+        Hs,V=oDI.sectorHamiltonian(N,J,h,parity,momentum,periodic)
+        assert np.allclose((V.conj().T@V).toarray(),np.eye(V.shape[1]))
+        energies.extend(np.linalg.eigvalsh(Hs.toarray()))
+    assert np.allclose(np.sort(energies),denseSpectrum(N,J,h,periodic))
+
+@pytest.mark.parametrize("N",[6,7])
+@pytest.mark.parametrize("J,h,periodic",[c for c in CASES if c[1]!=0])
+def test_ground_sector_holds_ground_state(N, J, h, periodic):
+    [(parity,momentum)]=oDI.groundSector(N,h,periodic)
+    Hs,V=oDI.sectorHamiltonian(N,J,h,parity,momentum,periodic)
+    assert np.linalg.eigvalsh(Hs.toarray())[0]==pytest.approx(denseSpectrum(N,J,h,periodic)[0])
+
+@pytest.mark.parametrize("k",[1,2])
+@pytest.mark.parametrize("backend,workers",[("sparse",1),("matrixfree",1),("sparse",2)])
+def test_ground_state_sweep_matches_dense(backend, workers, k):
+    x,energies=oDI.groundStateSweep(8,1.0,0.0,1,1.5,0.125,False,backend,workers,k)
+    assert len(x)==13 and energies.shape==(13,k)
+    for value,E in zip(x,energies):
+        assert np.allclose(E,denseSpectrum(8,1.0,value,False)[:k],atol=1e-8)
+
+@pytest.mark.parametrize("backend",["sparse","matrixfree"])
+def test_quench_matches_dense_evolution(backend):
+    from scipy.linalg import expm
+    N,J,h0,h1=8,1.0,0.5,1.5
+    times=[0,0.3,0.9]
+    _,vectors=np.linalg.eigh(oDI.qubitInteractions(N,J,True)+oDI.fieldInteractions(N,h0))
+    H1=oDI.qubitInteractions(N,J,True)+oDI.fieldInteractions(N,h1)
+    echo=[abs(np.vdot(vectors[:,0],expm(-1j*t*H1)@vectors[:,0]))**2 for t in times]
+    result=oDI.quench(N,J,h0,h1,times,True,backend)
+    assert np.allclose(result["Loschmidt echo"],echo,atol=1e-10)
+    assert result["Loschmidt echo"][0]==pytest.approx(1.0)
+
+def test_quench_backends_agree():
+    times=[0,0.3,0.9]
+    sparse=oDI.quench(8,1.0,0.5,1.5,times,True,"sparse")
+    matrixFree=oDI.quench(8,1.0,0.5,1.5,times,True,"matrixfree")
+    for key in ["Mx","Mz","Loschmidt echo"]:
+        assert np.allclose(sparse[key],matrixFree[key],atol=1e-10)
+
+def test_quench_from_an_eigenstate_is_stationary():
+    psi0=np.zeros(2**6)
+    psi0[0]=1
+    result=oDI.quench(6,1.0,0.0,0.0,[0,0.5,2.0],False,"sparse",psi0)
+    assert np.allclose(result["Loschmidt echo"],1.0)
+    assert np.allclose(result["Mz"],result["Mz"][0])
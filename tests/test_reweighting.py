@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import reweighting as rw
+from exactIsing import boltzmannWeights, exact, states
+
+def exactHistogram(N, J, T, H=0, samples=10**6):
+    """
+    The histogram a perfect run of samples sweeps at (T, H) would give, with fractional counts
+    """
+    weights,energies,mags=boltzmannWeights(N,J,T,H)
+    h=rw.histogram(N,J,T,H,energies,mags)
+    E0=np.round(energies+H*mags,9)
+    lookup={(e,m):k for k,(e,m) in enumerate(zip(h["E0"],h["M"]))}
+    counts=np.zeros(h["E0"].size)
+    np.add.at(counts,[lookup[(e,m)] for e,m in zip(E0,mags)],weights*samples)
+    return dict(h,counts=counts,samples=samples)
+
+def test_wham_recovers_exact_density_of_states():
+    N,J=3,1.0
+    dos=rw.densityOfStates([exactHistogram(N,J,T) for T in [1.5,2.5,4.0]])
+    bonds,mags=states(N)
+    pairs,degeneracy=np.unique(np.stack([-J*bonds.astype(float),mags],axis=1),axis=0,return_counts=True)
+    assert np.allclose(dos["E0"],pairs[:,0]) and np.array_equal(dos["M"],pairs[:,1])
+    lnG=dos["lnG"]-dos["lnG"][0]+np.log(degeneracy[0])
+    assert np.allclose(lnG,np.log(degeneracy),atol=1e-8)
+
+@pytest.mark.parametrize("T,H",[(2.0,0),(3.0,0),(2.5,0.3)])
+def test_reweighting_exact_histograms(T, H):
+    N,J=3,1.0
+    dos=rw.densityOfStates([exactHistogram(N,J,Ts) for Ts in [1.5,2.5,4.0]])
+    result=rw.reweight(dos,[T],H)
+    exactE,exactM=exact(N,J,T,H)
+    assert result["energy"][0]==pytest.approx(exactE)
+    assert result["magnetisation"][0]==pytest.approx(exactM)
+
+def test_single_histogram_is_ferrenberg_swendsen():
+    dos=rw.densityOfStates([exactHistogram(3,1.0,2.5)])
+    assert dos["iterations"]<=2
+    assert rw.reweight(dos,[2.2])["energy"][0]==pytest.approx(exact(3,1.0,2.2)[0])
+
+def test_reweighting_simulated_histograms():
+    N,J=4,1.0
+    histograms=[rw.histogramRun(N,J,T,0,8000,1000,"metropolis",k) for k,T in enumerate([2.0,2.6,3.2])]
+    result=rw.reweight(rw.densityOfStates(histograms),[2.3,2.9])
+    for T,e,m in zip(result["temperatures"],result["energy"],result["magnetisation"]):
+        exactE,exactM=exact(N,J,T)
+        assert e==pytest.approx(exactE,abs=0.02)
+        assert m==pytest.approx(exactM,abs=0.02)
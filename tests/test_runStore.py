@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+import runStore as rS
+import twoDIsing as tDI
+
+def uninterrupted(N, T, maxIters, seed):
+    return tDI.metropolisRun(N,1.0,T,0,maxIters,seed=seed,stableLimit=10**9)
+
+@pytest.mark.parametrize("stopAt,checkpointEvery",[(65535,65536),(49999,50000),(70000,100000)])
+def test_resume_matches_uninterrupted_run(tmp_path, stopAt, checkpointEvery):
+    """
+    Stopping at stopAt (a block boundary of the 65536 triple random stream for the first case) and resuming must give
+    exactly the run that never stopped
+    """
+    N,T,seed,maxIters=8,2.5,7,150000
+    reference=uninterrupted(N,T,maxIters,seed)
+    store=rS.RunStore(str(tmp_path),N,checkpointEvery)
+    tDI.metropolisRun(N,1.0,T,0,stopAt,seed=seed,stableLimit=10**9,store=store)
+    resumed=tDI.metropolisRun(N,1.0,T,0,maxIters,seed=seed,stableLimit=10**9,store=rS.RunStore(str(tmp_path),N,checkpointEvery))
+    assert resumed["lattice"]==reference["lattice"]
+    assert np.array_equal(resumed["energies"],reference["energies"])
+    assert np.array_equal(resumed["magnetisations"],reference["magnetisations"])
+    assert np.array_equal(resumed["iterations"],reference["iterations"])
+
+def test_resume_without_block_start_is_refused(tmp_path):
+    N,T,seed=8,2.5,7
+    tDI.metropolisRun(N,1.0,T,0,20000,seed=seed,stableLimit=10**9,store=rS.RunStore(str(tmp_path),N,10000))
+    store=rS.RunStore(str(tmp_path),N,10000)
+    del store.state["blockStart"]
+    with pytest.raises(ValueError,match="blockStart"):
+        tDI.metropolisRun(N,1.0,T,0,40000,seed=seed,stableLimit=10**9,store=store)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import wangLandau as wl
+from exactIsing import exact, states
+
+def exactLnG(N, joint=False):
+    """
+    Exact ln g over the energy indices k=(2N^2-B)/4 (and magnetisation columns when joint), -inf where there are no states
+    """
+    bonds,mags=states(N)
+    k=((2*N*N-bonds)//4).astype(np.int64)
+    if joint:
+        counts=np.zeros((N*N+1,N*N+1))
+        np.add.at(counts,(k,(mags+N*N)//2),1)
+    else:
+        counts=np.bincount(k,minlength=N*N+1).astype(float)
+    with np.errstate(divide="ignore"):
+        return np.log(counts)
+
+def test_energy_windows():
+    assert wl.energyWindows(4,1,0.25)==[(0,16)]
+    assert wl.energyWindows(4,2,0.25)==[(0,10),(8,16)]
+
+def test_stitch_removes_window_offsets():
+    lnG=exactLnG(4)[:,None]
+    visited=np.isfinite(lnG)
+    pieces=[(0,10,lnG[0:11]+3.0,visited[0:11]),(8,16,lnG[8:17]-7.5,visited[8:17])]
+    full=wl.stitch(pieces,16)
+    assert np.array_equal(np.isfinite(full),visited)
+    assert np.allclose(full[visited]-3.0,lnG[visited])
+    with pytest.raises(RuntimeError):
+        wl.stitch([(0,7,lnG[0:8],visited[0:8]),(8,16,lnG[8:17],visited[8:17])],16)
+
+@pytest.mark.parametrize("windows",[1,2])
+def test_density_of_states_matches_exact(windows):
+    dos=wl.wangLandau(4,windows=windows,lnfFinal=1e-5,workers=2,seed=1)
+    lnG=exactLnG(4)
+    finite=np.isfinite(lnG)
+    assert np.array_equal(np.isfinite(dos["lnG"]),finite)
+    assert np.abs(dos["lnG"][finite]-lnG[finite]).max()<0.2
+    results=wl.thermodynamics(dos,1.0,[1.5,2.27,3.5])
+    for T,e in zip(results["temperatures"],results["energy"]):
+        assert e==pytest.approx(exact(4,1.0,T)[0],abs=0.01)
+
+def test_joint_density_of_states_matches_exact():
+    dos=wl.wangLandau(3,joint=True,lnfFinal=1e-5,seed=2)
+    lnG=exactLnG(3,True)
+    finite=np.isfinite(lnG)
+    assert np.array_equal(np.isfinite(dos["lnG"]),finite)
+    assert np.abs(dos["lnG"][finite]-lnG[finite]).max()<0.2
+    results=wl.thermodynamics(dos,1.0,[2.0,3.0],H=0.3)
+    for T,e,m in zip(results["temperatures"],results["energy"],results["magnetisation"]):
+        exactE,exactM=exact(3,1.0,T,0.3)
+        assert e==pytest.approx(exactE,abs=0.01)
+        assert m==pytest.approx(exactM,abs=0.01)
@@ -1,15 +1,19 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from matplotlib.figure import Figure
-import imageio
 import random as rd
 import os
+import time
+from contextlib import nullcontext
+import equilibration as eq
+import runStore as rS
+import instrumentation as ins
 
-def gridGen(N:int)->list[list[int]]:
+def gridGen(N:int, rng:np.random.Generator | None =None)->list[list[int]]:
     """
     Generate a 2D lattice of random spins. Use dimensionless spin +/-1 for up/down.  
+    Pass a seeded numpy Generator as rng to make the lattice reproducible. 
     """
+    if rng is not None:
+        return rng.choice([-1,1],size=(N,N)).tolist()
     i=0 
     j=0 
     outputGrid=[]
@@ -22,6 +26,45 @@ def gridGen(N:int)->list[list[int]]:
         i+=1
     return outputGrid
 
+def acceptanceTable(J:float,T:float,H:float=0)->dict[tuple[int,int],float]:
+    """
+    Return the Metropolis acceptance probabilities for a square lattice, keyed by (spin before the flip, sum of the four neighbours). 
+    For fixed J, T and H the energy change dE=2*s*(J*f+H) only takes a handful of values, so exp(-dE/T) is computed once here 
+    instead of on every attempted flip. 
+    """
+    table={}
+    for s in (-1,1):
+        for f in (-4,-2,0,2,4):
+            dE=2*s*(J*f+H)
+            if dE<=0:
+                table[(s,f)]=1.0
+            elif T<=0:
+                table[(s,f)]=0.0
+            else:
+                table[(s,f)]=float(np.exp(-dE/T))
+    return table
+
+def randomSites(N:int, rng:np.random.Generator, blockSize:int=65536, cursor:dict | None =None, skip:int=0, start:int=0):
+    """
+    Yield (i, j, r) triples of a random site and a uniform random number in [0,1) for the single spin solvers. 
+    The numbers are drawn from rng in blocks of blockSize to avoid per-step random number calls. 
+    If cursor is given, cursor["state"] holds the rng state from just before the current block was drawn and 
+    cursor["start"] the position of that block's first triple, counting the first one yielded as start. Restoring the 
+    state and passing skip=position-cursor["start"] (which may equal blockSize when the block was used up) continues the 
+    exact same stream from position, which is how checkpoints resume. 
+    """
+    blockStart=start-skip
+    while True:
+        if cursor is not None:
+            cursor["state"]=rng.bit_generator.state
+            cursor["start"]=blockStart
+        iBlock=rng.integers(0,N,blockSize).tolist()
+        jBlock=rng.integers(0,N,blockSize).tolist()
+        rBlock=rng.random(blockSize).tolist()
+        yield from zip(iBlock[skip:],jBlock[skip:],rBlock[skip:])
+        skip=0
+        blockStart+=blockSize
+
 def hamiltonian(N:int,J:float,lattice:list[list[int]] | None =None):
     """
     Return the Ising energy of an N x N lattice with coupling strength J. 
@@ -58,6 +101,16 @@ def magnetisation(N:int,lattice:list[list[int]] | None =None):
         i+=1
     return mag
 
+def checkRunningTotals(N:int,J:float,lattice:list[list[int]],energy:float,mag:int,iters:int,H:float=0):
+    """
+    Debug check for the solvers that update energy and magnetisation incrementally. 
+    Recompute both from scratch (the energy including the field term -H*M) and raise a RuntimeError if the running totals have drifted. 
+    """
+    trueMag=magnetisation(N,lattice)
+    trueEnergy=hamiltonian(N,J,lattice)-H*trueMag
+    if not np.isclose(energy,trueEnergy) or mag!=trueMag:
+        raise RuntimeError("Running totals drifted at iteration "+str(iters)+": E="+str(energy)+" (expected "+str(trueEnergy)+"), M="+str(mag)+" (expected "+str(trueMag)+")")
+
 def chars(N,J):
     lattice=gridGen(N)
     energy=hamiltonian(N,J,lattice)
@@ -65,6 +118,7 @@ def chars(N,J):
     return energy, mag
 
 def spinPlotter(lattice):
+    import matplotlib.pyplot as plt
     i=0 
     j=0 
     N=len(lattice)
@@ -80,52 +134,164 @@ def spinPlotter(lattice):
     plt.show()
 
 def lattice_to_image(lattice, size=4):
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
+    from matplotlib.figure import Figure
     fig = Figure(figsize=(size, size))
     canvas = FigureCanvas(fig)
     ax = fig.add_subplot(111)
     ax.imshow(lattice, cmap='bwr', vmin=-1, vmax=1)
     ax.axis('off')
     canvas.draw()
-    img = np.frombuffer(canvas.tostring_rgb(), dtype='uint8')
-    img = img.reshape(canvas.get_width_height()[::-1] + (3,))
+    img = np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
     plt.close(fig)
     return img
 
-def metropolisFlips(N:int,J:float, T:float, maxIters:int=10000, fpsCustom:int=100, verbosity:bool=True, lattice:list[list[int]] | None =None):
+SPIN_COLOURS=np.array([[0,0,255],[255,255,255],[255,0,0]],dtype=np.uint8)
+
+def lattice_to_rgb(lattice, scale:int | None =None)->np.ndarray:
     """
-    Return the lattice in its thermal equillibrium state under temperature T and coupling strength J. 
-    Solve using the Monte Carlo method, implementing the Metropolis model of interaction* 
-    
-    *: A spin flip is guaranteed to happen when it causes the overall energy to be lower. It can also happen if it raises the energy with a probabilty of P=exp(dE/T) where dE is the 
-    energy raised by the flip
+    Map a +/-1 lattice straight to an RGB image (blue for -1, red for +1, the same colours as lattice_to_image) 
+    using a colour lookup, with every site drawn as a scale x scale block of pixels. No matplotlib figure is made. 
+    """
+    spins=np.asarray(lattice)
+    if scale is None:
+        scale=max(1,400//spins.shape[0])
+    img=SPIN_COLOURS[spins.astype(np.int64)+1]
+    return np.repeat(np.repeat(img,scale,axis=0),scale,axis=1)
+
+class VideoRecorder:
+    """
+    Stream lattice snapshots to a video file through an imageio writer, one frame every frameEvery iterations, 
+    so memory use does not grow with the length of the run. With metrics (an instrumentation.Metrics) the rendering and 
+    encoding time, the frames and the bytes of the finished file are recorded. 
+    """
+    def __init__(self, path:str, fps:int=100, frameEvery:int=1, scale:int | None =None, metrics:ins.Metrics | None =None):
+        self.path=path
+        self.frameEvery=max(1,frameEvery)
+        self.scale=scale
+        self.frameCount=0
+        self.metrics=metrics
+        import imageio
+        self.writer=imageio.get_writer(path, fps=fps)
+
+    def add(self, iters:int, lattice):
+        """
+        Write the lattice as a frame if iteration iters falls on the recording cadence
+        """
+        if iters%self.frameEvery==0:
+            if self.metrics is None:
+                self.writer.append_data(lattice_to_rgb(lattice,self.scale))
+            else:
+                with self.metrics.phase("rendering"):
+                    self.writer.append_data(lattice_to_rgb(lattice,self.scale))
+                self.metrics.count("frames")
+            self.frameCount+=1
+
+    def close(self):
+        """
+        Flush and encode the remaining frames, timed as the video phase with metrics
+        """
+        if self.metrics is None:
+            self.writer.close()
+            return
+        with self.metrics.phase("video"):
+            self.writer.close()
+        if os.path.exists(self.path):
+            self.metrics.count("bytesWritten",os.path.getsize(self.path))
+
+def metropolisRun(N:int,J:float,T:float,H:float=0,maxIters:int=10000,lattice:list[list[int]] | None =None,seed:int | None =None,stableLimit:int=1000,checkEvery:int=0,recorder:VideoRecorder | None =None,verbosity:bool=False,progress:bool=False,monitor:eq.EquilibrationMonitor | None =None,store:rS.RunStore | None =None,metrics:ins.Metrics | None =None,flipLog=None)->dict:
+    """
+    Pure compute core of the single spin Metropolis solvers (metropolisFlips, twoDIsing_MagField.metropolisMagnetisation and 
+    tempMagnetisation.MagnetisationMetropolisFlips). Nothing is printed, plotted or saved unless asked for: verbosity prints 
+    the per-flip debug output, progress prints a status block every iteration and recorder (a VideoRecorder) records frames. 
+
+    A spin flip is always accepted when it lowers the energy, otherwise with probability exp(-dE/T) where dE=2*s*(J*f+H). 
+    The run stops after maxIters attempts or once stableLimit attempts in a row have been rejected. 
+    Passing monitor (an equilibration.EquilibrationMonitor) replaces the stableLimit rule: the energy and magnetisation are 
+    fed to it once per sweep (N^2 attempts) and the run stops once it reports equilibrium and its target error. 
+    The energy (including the field term -H*M) and magnetisation are running totals updated on every accepted flip; 
+    checkEvery=K recomputes both every K iterations as a debug check. Acceptance probabilities come from acceptanceTable 
+    and random numbers from a numpy Generator seeded with seed, so a fixed seed reproduces a run exactly. 
+
+    Return a dict with "lattice", "energies" and "magnetisations" (recorded after every attempt), "iterations" (the matching 
+    iteration numbers), the final "energy" and "magnetisation", and "converged" (False if maxIters ran out first). 
+    With a monitor the dict also holds its summary under "equilibration". 
+
+    Passing store (a runStore.RunStore) streams the observables to disk instead of keeping them in lists and checkpoints 
+    the lattice, counters and RNG state every store.checkpointEvery iterations and at the end. If the store already holds a 
+    checkpoint of the same run (N, J, T and H must match) the run picks up exactly where it left off, and a finished run can 
+    be extended with a larger maxIters. The returned observables are then read-only memory maps of the store. 
+
+    Passing metrics (an instrumentation.Metrics) records the time of each phase (kernel, checks, progress, rendering, monitor, 
+    checkpoint), the attempts and accepts per dE class and the bytes checkpointed, and returns it under "metrics". Its 
+    progressInterval gives one status line every so many seconds, unlike progress which prints every iteration. 
+
+    Passing flipLog (a flipLog.FlipLog) records the trajectory compactly: the starting lattice, the site of every accepted 
+    flip and a keyframe every flipLog.keyframeEvery iterations, from which flipLog.FlipReplay rebuilds any iteration, 
+    renders the video or recomputes the observables after the run. A resumed run logs from where it resumes. 
 
     Note: kB=1, express T in units of the coupling strength J
     """
-    frames=[]
     energies=[]
+    magnetisations=[]
     iterationList=[]
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    videoPath = os.path.join(script_dir, "isingSim_2D.mp4")
-    if lattice==None:
-        lattice=gridGen(N)
-    energyStable=0 
-    iters=0
-    while energyStable<=1000 and iters<=maxIters:
-        i=rd.randint(0,N-1)
-        j=rd.randint(0,N-1)
+    rng=np.random.default_rng(seed)
+    table=acceptanceTable(J,T,H)
+    blockSize=65536
+    sweep=N*N
+    saved=store.state if store is not None else None
+    if saved is not None:
+        if [saved["N"],saved["J"],saved["T"],saved["H"]]!=[N,J,T,H]:
+            raise ValueError("Run store "+store.path+" holds a run with (N,J,T,H)="+str((saved["N"],saved["J"],saved["T"],saved["H"])))
+        lattice=store.loadLattice()
+        rng.bit_generator.state=saved["rng"]
+        iters=saved["iters"]
+        energyStable=saved["energyStable"]
+        energy=saved["energy"]
+        mag=saved["mag"]
+        stop=saved["stop"]
+        if "blockStart" not in saved:
+            raise ValueError("Run store "+store.path+" has no blockStart in its checkpoint; it was written by an older version and cannot be resumed exactly")
+        skip=iters-saved["blockStart"]
+        if monitor is not None:
+            iterationsSoFar,energiesSoFar,magsSoFar=store.observables()
+            for k in range(sweep-1,iterationsSoFar.size,sweep):
+                monitor.add(float(energiesSoFar[k]),int(magsSoFar[k]))
+    else:
+        if lattice is None:
+            lattice=gridGen(N,rng)
+        energyStable=0 
+        iters=0
+        mag=magnetisation(N,lattice)
+        energy=hamiltonian(N,J,lattice)-H*mag
+        stop=False
+        skip=0
+    cursor={}
+    sites=randomSites(N,rng,blockSize,cursor,skip,iters)
+    phase=metrics.phase if metrics is not None else nullcontext
+    nxt=[(k+1)%N for k in range(N)]
+    prv=[(k-1)%N for k in range(N)]
+    if metrics is not None:
+        loopStart=time.perf_counter()
+        timedBefore=sum(metrics.timers.values())
+        bytesBefore=store.bytesWritten if store is not None else 0
+    if flipLog is not None:
+        flipLog.begin(lattice,iters-1)
+    def saveCheckpoint():
+        store.checkpoint(lattice,{"N":N, "J":J, "T":T, "H":H, "iters":iters, "energyStable":energyStable, "energy":energy,
+                                  "mag":mag, "stop":stop, "rng":cursor["state"], "blockStart":cursor["start"]})
+    while not stop and iters<=maxIters:
+        i,j,r=next(sites)
         if verbosity:
             print("Trying to flip ", (j,i))
-        newEnergy= hamiltonian(N,J,lattice)
-        energies.append(newEnergy)
-        iterationList.append(iters)
-        f = (lattice[(i+1)%N][j] +lattice[(i-1)%N][j] +lattice[i][(j+1)%N] +lattice[i][(j-1)%N])
-        dE=2*J*lattice[i][j]*f
+        f = (lattice[nxt[i]][j] +lattice[prv[i]][j] +lattice[i][nxt[j]] +lattice[i][prv[j]])
+        dE= 2*lattice[i][j]*(J*f+H) 
+        trial=dE
         if verbosity:
             print("Energy change if successsful:", dE)
         if dE>0:
-            b=1/T
-            transProb=np.exp(-b*dE)
-            r=rd.random()
+            transProb=table[(lattice[i][j],f)]
             if r>transProb:
                 dE=0
                 energyStable+=1
@@ -141,21 +307,103 @@ def metropolisFlips(N:int,J:float, T:float, maxIters:int=10000, fpsCustom:int=10
             lattice[i][j]=-lattice[i][j]
             if verbosity:
                 print("Flip successful")
+        if energyStable==0:
+            energy+=dE
+            mag+=2*lattice[i][j]
+            if flipLog is not None:
+                flipLog.flip(iters,i*N+j)
+        if flipLog is not None and iters%flipLog.keyframeEvery==0:
+            flipLog.keyframe(iters,lattice)
+        if metrics is not None:
+            metrics.attempt(trial,energyStable==0)
+            metrics.tick(iters,energy,mag)
+        if checkEvery and iters%checkEvery==0:
+            with phase("checks"):
+                checkRunningTotals(N,J,lattice,energy,mag,iters,H)
         if verbosity:
             for line in lattice:
                 print(line)
-        print(30*"\n","Solver running. Do not close or interrupt program.\n Iteration ", iters, "out of a maximum possibility of ", maxIters,"\n Equilibrium not reached yet. Current energy=", newEnergy)
-        frames.append(lattice_to_image(lattice))
+        if store is None:
+            iterationList.append(iters)
+            energies.append(energy)
+            magnetisations.append(mag)
+        else:
+            store.append(iters,energy,mag)
+        if progress:
+            with phase("progress"):
+                print(30*"\n","Solver running for N=",N,". Do not close or interrupt program.\n Iteration ", iters, "out of a maximum possibility of ", maxIters,"\n Equilibrium not reached yet.\n Current status: Energy=", energy, "|| Magnetisation=", mag)
+        if recorder is not None:
+            recorder.add(iters,lattice)
+        if monitor is None:
+            stop=energyStable>stableLimit
+        elif (iters+1)%sweep==0:
+            with phase("monitor"):
+                stop=monitor.add(energy,mag)
         if verbosity:
             print("Energy change from flip: ", dE)
-            print("Energy: ", newEnergy)
+            print("Energy: ", energy)
             print("No Change Counter: ", energyStable)
-            print("Frame added, current frame count: ",len(frames) )
    #     print(30*"=")
         iters+=1
+        if store is not None and iters%store.checkpointEvery==0:
+            with phase("checkpoint"):
+                saveCheckpoint()
+    if store is not None:
+        if "state" in cursor:
+            with phase("checkpoint"):
+                saveCheckpoint()
+        iterationList,energies,magnetisations=store.observables()
+    if flipLog is not None:
+        flipLog.close(iters-1,lattice)
+    if metrics is not None:
+        metrics.add("kernel",time.perf_counter()-loopStart-(sum(metrics.timers.values())-timedBefore))
+        if store is not None:
+            metrics.count("bytesWritten",store.bytesWritten-bytesBefore)
+        if flipLog is not None:
+            metrics.count("bytesWritten",flipLog.bytesWritten)
+    result={"lattice":lattice, "energies":energies, "magnetisations":magnetisations, "iterations":iterationList,
+            "energy":energy, "magnetisation":mag, "converged":stop}
+    if monitor is not None:
+        result["equilibration"]=monitor.summary()
+    if metrics is not None:
+        result["metrics"]=metrics
+    return result
+
+def metropolisFlips(N:int,J:float, T:float, maxIters:int=10000, fpsCustom:int=100, verbosity:bool=True, lattice:list[list[int]] | None =None, checkEvery:int=0, seed:int | None =None, frameEvery:int=1, progress:bool=True, video:bool=True, show:bool=True, targetError:float | None =None, metrics:ins.Metrics | None =None, flipLogPath:str | None =None):
+    """
+    Return the lattice in its thermal equillibrium state under temperature T and coupling strength J. 
+    Solve using the Monte Carlo method, implementing the Metropolis model of interaction* 
+    
+    *: A spin flip is guaranteed to happen when it causes the overall energy to be lower. It can also happen if it raises the energy with a probabilty of P=exp(dE/T) where dE is the 
+    energy raised by the flip
+
+    Note: kB=1, express T in units of the coupling strength J
+
+    This is the interactive front end of metropolisRun (see there for checkEvery and seed). The video is streamed to disk while 
+    solving with one frame every frameEvery iterations (frameEvery=N*N gives one frame per sweep). Set progress, video or show 
+    to False to skip the status output, the video or the energy plot. With targetError set, the run stops on 
+    equilibration detection (an equilibration.EquilibrationMonitor with that error per site) instead of 1000 rejected flips in a row. 
+    metrics (an instrumentation.Metrics) profiles the run, the video and the plotting (which includes the time the plot 
+    window stays open) and prints a report at the end; if it has a progressInterval, its periodic status lines replace 
+    the per-iteration progress output. 
+    flipLogPath writes a flipLog.FlipLog there instead of (or as well as) the video; flipLog.FlipReplay can render the video 
+    from it later at any frame rate, so pass video=False to keep the solver free of rendering altogether. 
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    videoPath = os.path.join(script_dir, "isingSim_2D.mp4")
+    recorder=VideoRecorder(videoPath,fpsCustom,frameEvery,metrics=metrics) if video else None
+    monitor=eq.EquilibrationMonitor(N*N,targetError) if targetError is not None else None
+    if metrics is not None and metrics.progressInterval is not None:
+        progress=False
+    flipLog=None
+    if flipLogPath is not None:
+        import flipLog as fL
+        flipLog=fL.FlipLog(flipLogPath,N,J)
+    result=metropolisRun(N,J,T,0,maxIters,lattice,seed,1000,checkEvery,recorder,verbosity,progress,monitor,metrics=metrics,flipLog=flipLog)
+    newEnergy=result["energy"]
     print(30*"\n")
     print(100*"-")
-    if iters>=maxIters:
+    if not result["converged"]:
         print("Solving Complete. Equilibrium state not reached before maximum iteration limit. ")
     else: 
         print("Solving Complete.")
@@ -163,20 +411,32 @@ def metropolisFlips(N:int,J:float, T:float, maxIters:int=10000, fpsCustom:int=10
             print("Equilibrium state reached. Found ground state energy eigenvalue E=", newEnergy)
         else:
             print("Equilibrium state reached at an energy of E=", newEnergy)
-        print("Iterations before convergence: ", iters)
+        print("Iterations before convergence: ", len(result["iterations"]))
+    if "equilibration" in result:
+        eqm=result["equilibration"]
+        print("Burn-in: ", eqm["burnIn"], " sweeps || tau_E=", eqm["tauE"], " || tau_M=", eqm["tauM"], " sweeps")
+        print("Equilibrium averages per site: e=", eqm["meanE"], "+/-", eqm["errE"], " || |m|=", eqm["meanM"], "+/-", eqm["errM"])
     print(100*"-")
     print("\nPost-processing solution:")
-    print("Constructing video representation...")
-    print("Plotting iteration-by-iteration energies...")
-    imageio.mimsave(videoPath, frames, fps=fpsCustom)
-    print("Video saved to ", videoPath)
+    if recorder is not None:
+        recorder.close()
+        print("Video saved to ", videoPath)
+    if flipLog is not None:
+        print("Flip log saved to ", flipLogPath)
    # spinPlotter(lattice)
-    plt.plot(iterationList,energies,color="black")
-    plt.xlabel("Iterations")
-    plt.ylabel("Energy of Lattice")
-    print("Post-processing complete. See output plot for energy evolution and output video for lattice video. ")
-    plt.show()
-    return lattice
+    plotStart=time.perf_counter()
+    if show:
+        import matplotlib.pyplot as plt
+        print("Plotting iteration-by-iteration energies...")
+        plt.plot(result["iterations"],result["energies"],color="black")
+        plt.xlabel("Iterations")
+        plt.ylabel("Energy of Lattice")
+        plt.show()
+    print("Post-processing complete.")
+    if metrics is not None:
+        metrics.add("plotting",time.perf_counter()-plotStart)
+        metrics.report()
+    return result["lattice"]
 
 def terminalMetropolis():
     print(100*"=")
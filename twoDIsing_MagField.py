@@ -1,16 +1,13 @@
-
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from matplotlib.figure import Figure
-import imageio
-import random as rd
 import os
+import time
 import twoDIsing as tDI
+import equilibration as eq
+import runStore as rS
+import instrumentation as ins
 
-def metropolisMagnetisation(N:int,J:float, T:float, H:float, maxIters:int=50000, fpsCustom=100, verbosity:bool=True, lattice:list[list[int]] | None =None):
+def metropolisMagnetisation(N:int,J:float, T:float, H:float, maxIters:int=50000, fpsCustom=100, verbosity:bool=True, lattice:list[list[int]] | None =None, checkEvery:int=0, seed:int | None =None, frameEvery:int=1, progress:bool=True, video:bool=True, show:bool=True, targetError:float | None =None, storePath:str | None =None, checkpointEvery:int=100000, metrics:ins.Metrics | None =None, flipLogPath:str | None =None):
     """
-    Return the lattice in its thermal equillibrium state under temperature T and coupling strength J. 
+    Return the magnetisation of the lattice in its thermal equillibrium state under temperature T and coupling strength J. 
     Solve using the Monte Carlo method, implementing the Metropolis model of interaction* 
     
     *: A spin flip is guaranteed to happen when it causes the overall energy to be lower. It can also happen if it raises the energy with a probabilty of P=exp(dE/T) where dE is the 
@@ -19,98 +16,85 @@ def metropolisMagnetisation(N:int,J:float, T:float, H:float, maxIters:int=50000,
     Note: kB=1, express T in units of the coupling strength J
 
     H is the external magnetic field strength
+
+    This is the interactive front end of twoDIsing.metropolisRun (see there for checkEvery and seed); use that directly 
+    for the full results without any output. The video is streamed to disk while solving with one frame every frameEvery 
+    iterations (frameEvery=N*N gives one frame per sweep). Set progress, video or show to False to skip the status output, 
+    the video or the plots. With targetError set, the run stops on equilibration detection (see 
+    equilibration.EquilibrationMonitor) instead of 69*N rejected flips in a row. 
+
+    storePath keeps the observables on disk in a runStore.RunStore directory instead of in memory, with a checkpoint every 
+    checkpointEvery iterations. Calling again with the same storePath resumes the run from its last checkpoint. 
+
+    metrics (an instrumentation.Metrics) profiles the run, the video and the plotting (which includes the time the plot 
+    window stays open) and prints a report at the end; if it has a progressInterval, its periodic status lines replace 
+    the per-iteration progress output. 
+    flipLogPath writes a flipLog.FlipLog there instead of (or as well as) the video; flipLog.FlipReplay can render the video 
+    from it later at any frame rate, so pass video=False to keep the solver free of rendering altogether. 
     """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     videoPath = os.path.join(script_dir, "isingSim_2D.mp4")
-    energies=[]
-    frames=[]
-    iterationList=[]
-    magnetisations=[]
-    if lattice==None:
-        lattice=tDI.gridGen(N)
-    energyStable=0 
-    magnetisation=0
-    iters=0
-    while energyStable<=69*N and iters<=maxIters:
-        i=rd.randint(0,N-1)
-        j=rd.randint(0,N-1)
-        if verbosity:
-            print("Trying to flip ", (j,i))
-        iterationList.append(iters)
-        f = (lattice[(i+1)%N][j] +lattice[(i-1)%N][j] +lattice[i][(j+1)%N] +lattice[i][(j-1)%N])
-        dE= 2*lattice[i][j]*(J*f+H) 
-        if verbosity:
-            print("Energy change if successsful:", dE)
-        if dE>0:
-            b=1/T
-            transProb=np.exp(-b*dE)
-            r=rd.random()
-            if r>transProb:
-                dE=0
-                energyStable+=1
-                if verbosity:
-                    print("Flip failed")
-            else:
-                energyStable=0
-                lattice[i][j]=-lattice[i][j]
-                if verbosity:
-                    print("Flip successful")
-        elif dE<=0:
-            lattice[i][j]=-lattice[i][j]
-            energyStable=0
-            if verbosity:
-                print("Flip successful")
-        if verbosity:
-            for line in lattice:
-                print(line)
-        newEnergy= tDI.hamiltonian(N,J,lattice)
-        energies.append(newEnergy)
-        print(30*"\n","Solver running for N=",N,". Do not close or interrupt program.\n Iteration ", iters, "out of a maximum possibility of ", maxIters,"\n Equilibrium not reached yet.\n Current status: Energy=", newEnergy, "|| Magnetisation=", magnetisation)
-        frames.append(tDI.lattice_to_image(lattice))
-        if verbosity:
-            print("Energy change from flip: ", dE)
-            print("Energy: ", newEnergy)
-            print("No Change Counter: ", energyStable)
-   #     print(30*"=")
-        magnetisation=tDI.magnetisation(N,lattice)
-        magnetisations.append(magnetisation)
-        iters+=1
+    recorder=tDI.VideoRecorder(videoPath,fpsCustom,frameEvery,metrics=metrics) if video else None
+    monitor=eq.EquilibrationMonitor(N*N,targetError) if targetError is not None else None
+    store=rS.RunStore(storePath,N,checkpointEvery) if storePath is not None else None
+    if metrics is not None and metrics.progressInterval is not None:
+        progress=False
+    flipLog=None
+    if flipLogPath is not None:
+        import flipLog as fL
+        flipLog=fL.FlipLog(flipLogPath,N,J,H)
+    result=tDI.metropolisRun(N,J,T,H,maxIters,lattice,seed,69*N,checkEvery,recorder,verbosity,progress,monitor,store,metrics,flipLog)
+    lattice=result["lattice"]
+    newEnergy=result["energy"]
+    magnetisation=result["magnetisation"]
     print(30*"\n")
     print(160*"-")
-    if iters>=maxIters:
+    if not result["converged"]:
         print("Solving Complete. Equilibrium state not reached before maximum iteration limit. Displaying conditions of the last iteration.")
         print("Energy: E=", newEnergy, " || magnetisation: M=", magnetisation)
     else: 
         print("Solving Complete. Equilibrium state reached at the conditions shown below.")
         print("Energy: E=", newEnergy, " || Magnetisation: M=", magnetisation)
-        print("Iterations before convergence: ", iters)
+        print("Iterations before convergence: ", len(result["iterations"]))
+    if "equilibration" in result:
+        eqm=result["equilibration"]
+        print("Burn-in: ", eqm["burnIn"], " sweeps || tau_E=", eqm["tauE"], " || tau_M=", eqm["tauM"], " sweeps")
+        print("Equilibrium averages per site: e=", eqm["meanE"], "+/-", eqm["errE"], " || |m|=", eqm["meanM"], "+/-", eqm["errM"])
     print(160*"-")
     print("\nPost-processing solution:")
-    print("Constructing video representation...")
-    print("Plotting iteration-by-iteration energies...")
-    imageio.mimsave(videoPath, frames, fps=fpsCustom)
-    print("Video saved to ", videoPath)
-    fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18,6))
-    ax1.plot(iterationList,magnetisations,color="black")
-    ax1.set_xlabel("Iterations")
-    ax1.set_ylabel("Magnetisation")
-    ax2.plot(iterationList,energies,color="black")
-    ax2.set_xlabel("Iterations")
-    ax2.set_ylabel("Energy")
-    fig.suptitle("Energies and Magnetisation vs Iterations")
-    print("Post-processing complete. See output plot for energy evolution and output video for lattice video. ")
-    i=0 
-    j=0
-    while i<N:
+    if recorder is not None:
+        recorder.close()
+        print("Video saved to ", videoPath)
+    if flipLog is not None:
+        print("Flip log saved to ", flipLogPath)
+    plotStart=time.perf_counter()
+    if show:
+        import matplotlib.pyplot as plt
+        print("Plotting iteration-by-iteration energies...")
+        fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18,6))
+        ax1.plot(result["iterations"],result["magnetisations"],color="black")
+        ax1.set_xlabel("Iterations")
+        ax1.set_ylabel("Magnetisation")
+        ax2.plot(result["iterations"],result["energies"],color="black")
+        ax2.set_xlabel("Iterations")
+        ax2.set_ylabel("Energy")
+        fig.suptitle("Energies and Magnetisation vs Iterations")
+        i=0 
         j=0
-        while j<N:
-            if lattice[i][j]<0:
-                plt.plot(j,i,".",color="red")
-            else:
-                plt.plot(j,i,".",color="blue")
-            j+=1
-        i+=1
-    plt.show()
+        while i<N:
+            j=0
+            while j<N:
+                if lattice[i][j]<0:
+                    plt.plot(j,i,".",color="red")
+                else:
+                    plt.plot(j,i,".",color="blue")
+                j+=1
+            i+=1
+        plt.show()
+    print("Post-processing complete.")
+    if metrics is not None:
+        metrics.add("plotting",time.perf_counter()-plotStart)
+        metrics.report()
     return magnetisation
 
 def terminalMetropolis():
@@ -145,4 +129,5 @@ def terminalMetropolis():
 
 #High magnetic field magnitude => converge (all polarised in same direction) faster, + => up, -=> down, |M| converges to N^2 
 #Magnitisation magnetic field near 0 => more chaotic, less neatly polarised
-terminalMetropolis()
\ No newline at end of file
+if __name__=="__main__":
+    terminalMetropolis()
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Wang-Landau sampling of the density of states g(E) of the periodic N x N lattice (optionally the joint g(E, M)).
+One run gives the thermodynamics at every temperature: <E>, C, the free energy and the entropy (and <|M|>, chi with the
+joint density) follow from g by a sum, instead of one simulation per temperature.
+
+Energies are indexed by the bond sum B=sum_<ij> s_i s_j through k=(2N^2-B)/4 (k=0 is the ferromagnetic ground state, E=-J*B),
+so g does not depend on J. The energy range can be split into overlapping windows, each sampled by its own worker process,
+and the pieces are stitched together afterwards.
+"""
+import numpy as np
+from scipy.special import logsumexp
+from concurrent.futures import ProcessPoolExecutor
+import twoDIsing as tDI
+
+def enterWindow(N:int, lattice:list[list[int]], k:int, m:int, lo:int, hi:int, rng:np.random.Generator, maxAttempts:int=10**7):
+    """
+    Flip random spins of lattice (in place), keeping any flip that does not move the energy index k further from [lo, hi],
+    until k lies inside the window. Return the new (k, m).
+    """
+    nxt=[(x+1)%N for x in range(N)]
+    prv=[(x-1)%N for x in range(N)]
+    sites=tDI.randomSites(N,rng)
+    distance=lambda x: lo-x if x<lo else (x-hi if x>hi else 0)
+    attempts=0
+    while distance(k)>0:
+        if attempts>maxAttempts:
+            raise RuntimeError("Could not reach the energy window ["+str(lo)+", "+str(hi)+"]")
+        i,j,r=next(sites)
+        s=lattice[i][j]
+        kNew=k+s*(lattice[nxt[i]][j]+lattice[prv[i]][j]+lattice[i][nxt[j]]+lattice[i][prv[j]])//2
+        if distance(kNew)<=distance(k):
+            lattice[i][j]=-s
+            k=kNew
+            m-=2*s
+        attempts+=1
+    return k, m
+
+def windowWorker(args)->tuple[int,int,np.ndarray,np.ndarray]:
+    """
+    Run Wang-Landau inside the energy window [lo, hi] and return (lo, hi, lnG, visited) for those rows
+    """
+    N,lo,hi,joint,lnfFinal,flatness,checkSweeps,seed=args
+    rng=np.random.default_rng(seed)
+    sites=N*N
+    Mbins=sites+1 if joint else 1
+    lattice=[[1]*N for x in range(N)]
+    k,m=enterWindow(N,lattice,0,sites,lo,hi,rng)
+    nxt=[(x+1)%N for x in range(N)]
+    prv=[(x-1)%N for x in range(N)]
+    rows=hi-lo+1
+    lnG=[0.0]*(rows*Mbins)
+    hist=[0]*(rows*Mbins)
+    visited=np.zeros(rows*Mbins,dtype=bool)
+    mIndex=lambda mag: (mag+sites)//2 if joint else 0
+    current=(k-lo)*Mbins+mIndex(m)
+    spins=tDI.randomSites(N,rng)
+    lnf=1.0
+    checkEvery=checkSweeps*sites
+    steps=0
+    oneOverT=False
+    exp=np.exp
+    while lnf>lnfFinal:
+        step=0
+        while step<checkEvery:
+            i,j,r=next(spins)
+            s=lattice[i][j]
+            kNew=k+s*(lattice[nxt[i]][j]+lattice[prv[i]][j]+lattice[i][nxt[j]]+lattice[i][prv[j]])//2
+            if lo<=kNew<=hi:
+                proposed=(kNew-lo)*Mbins+mIndex(m-2*s)
+                diff=lnG[current]-lnG[proposed]
+                if diff>=0 or r<exp(diff):
+                    lattice[i][j]=-s
+                    k=kNew
+                    m-=2*s
+                    current=proposed
+            lnG[current]+=lnf
+            hist[current]+=1
+            step+=1
+        steps+=checkEvery
+        counts=np.array(hist)
+        visited|=counts>0
+        levels=np.count_nonzero(visited)
+        if oneOverT:
+            lnf=levels/steps
+        else:
+            seen=counts[visited]
+            if seen.min()>=flatness*seen.mean():
+                lnf/=2
+                hist=[0]*(rows*Mbins)
+                if lnf<levels/steps:
+                    oneOverT=True
+                    lnf=levels/steps
+    lnG=np.array(lnG).reshape(rows,Mbins)
+    return lo, hi, lnG, visited.reshape(rows,Mbins)
+
+def energyWindows(N:int, windows:int, overlap:float)->list[tuple[int,int]]:
+    """
+    Split the energy indices 0..N^2 into windows of equal width, each extended by overlap (a fraction of the width)
+    into the next one
+    """
+    top=N*N
+    edges=np.linspace(0,top,windows+1)
+    width=top/windows
+    return [(int(np.floor(edges[w])),int(min(top,np.ceil(edges[w+1]+overlap*width)))) for w in range(windows)]
+
+def stitch(pieces:list[tuple[int,int,np.ndarray,np.ndarray]], top:int)->np.ndarray:
+    """
+    Join per-window lnG pieces (sorted by lo) into one array over 0..top, shifting each piece to match its predecessor on
+    the bins both visited and switching over in the middle of the overlap. Bins nobody visited are -inf.
+    """
+    lo,hi,lnG,visited=pieces[0]
+    full=np.full((top+1,lnG.shape[1]),-np.inf)
+    full[lo:hi+1]=np.where(visited,lnG,-np.inf)
+    prevHi=hi
+    for lo,hi,lnG,visited in pieces[1:]:
+        overlapRows=slice(lo,prevHi+1)
+        common=visited[:prevHi+1-lo] & np.isfinite(full[overlapRows])
+        if not common.any():
+            raise RuntimeError("Energy windows starting at "+str(lo)+" do not overlap with the previous one; increase overlap")
+        shift=np.mean(full[overlapRows][common]-lnG[:prevHi+1-lo][common])
+        cut=(lo+prevHi)//2
+        piece=np.where(visited,lnG+shift,-np.inf)
+        full[cut+1:hi+1]=piece[cut+1-lo:]
+        prevHi=hi
+    return full
+
+def wangLandau(N:int, windows:int=1, overlap:float=0.25, joint:bool=False, lnfFinal:float=1e-6, flatness:float=0.8, checkSweeps:int=100, workers:int | None =None, seed:int | None =None)->dict:
+    """
+    Estimate ln g of the periodic N x N lattice by Wang-Landau sampling: single spin flips with the incremental energy change,
+    accepted with probability min(1, g(old)/g(new)), adding lnf to ln g of the current bin after every attempt. Every
+    checkSweeps sweeps the histogram is tested for flatness (all visited bins at least flatness times the mean); when flat,
+    lnf is halved and the histogram reset. Plain halving freezes the error of ln g once lnf gets small, so as soon as lnf
+    drops below levels/t (t attempts so far, levels the number of bins visited) it follows levels/t instead (the 1/t
+    variant of Belardinelli and Pereyra), until lnf<lnfFinal. joint=True samples g(E, M) instead of g(E).
+
+    windows>1 splits the energy range into that many overlapping windows run in parallel worker processes and stitched.
+    The result is normalised so that the states sum to 2^(N^2).
+
+    Return a dict with "N", "joint", "k" (energy indices), "bonds" (the bond sum B of each index), "M" (magnetisations,
+    joint only) and "lnG" (rows are energy indices, columns magnetisations when joint, -inf for unreachable states).
+    """
+    top=N*N
+    streams=np.random.SeedSequence(seed).spawn(windows)
+    jobs=[(N,lo,hi,joint,lnfFinal,flatness,checkSweeps,streams[w]) for w,(lo,hi) in enumerate(energyWindows(N,windows,overlap))]
+    if windows==1:
+        pieces=[windowWorker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pieces=list(pool.map(windowWorker,jobs))
+    lnG=stitch(pieces,top)
+    lnG+=top*np.log(2)-logsumexp(lnG)
+    k=np.arange(top+1)
+    dos={"N":N, "joint":joint, "k":k, "bonds":2*top-4*k, "lnG":lnG if joint else lnG[:,0]}
+    if joint:
+        dos["M"]=2*np.arange(top+1)-top
+    return dos
+
+def thermodynamics(dos:dict, J:float, temps:list[float], H:float=0)->dict:
+    """
+    Evaluate a wangLandau density of states at every temperature in temps. Return a dict of per-site lists:
+    "temperatures", "energy" <E>, "specificHeat" C, "freeEnergy" F=-T ln Z and "entropy" S=(<E>-F)/T, plus "magnetisation"
+    <|M|> and "susceptibility" (from <M^2>-<|M|>^2) for a joint density, which is also needed for a field H.
+    """
+    temps=np.atleast_1d(np.asarray(temps,dtype=float))
+    sites=dos["N"]**2
+    E=-J*dos["bonds"].astype(float)
+    lnG=dos["lnG"]
+    if dos["joint"]:
+        M=dos["M"].astype(float)
+        E=E[:,None]-H*M[None,:]
+        M=np.broadcast_to(M[None,:],E.shape).ravel()
+        E=E.ravel()
+        lnG=lnG.ravel()
+    elif H!=0:
+        raise ValueError("A field H needs the joint density of states (joint=True)")
+    finite=np.isfinite(lnG)
+    E=E[finite]
+    lnW=lnG[finite][None,:]-E[None,:]/temps[:,None]
+    lnZ=logsumexp(lnW,axis=1)
+    p=np.exp(lnW-lnZ[:,None])
+    meanE=p@E
+    meanE2=p@(E*E)
+    F=-temps*lnZ
+    results={"temperatures":temps.tolist(), "energy":(meanE/sites).tolist(),
+             "specificHeat":((meanE2-meanE**2)/(sites*temps**2)).tolist(),
+             "freeEnergy":(F/sites).tolist(), "entropy":((meanE-F)/(sites*temps)).tolist()}
+    if dos["joint"]:
+        absM=np.abs(M[finite])
+        meanAbsM=p@absM
+        results["magnetisation"]=(meanAbsM/sites).tolist()
+        results["susceptibility"]=((p@(absM*absM)-meanAbsM**2)/(sites*temps)).tolist()
+    return results